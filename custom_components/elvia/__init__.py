@@ -2,14 +2,196 @@
 
 from __future__ import annotations
 
+from typing import Any
+
+import asyncio
+from time import monotonic
+
+import voluptuous as vol
+
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
 from homeassistant.const import CONF_API_KEY
+from homeassistant.exceptions import (
+    ConfigEntryAuthFailed,
+    ConfigEntryNotReady,
+    ServiceValidationError,
+)
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.start import async_at_started
+from homeassistant.helpers.typing import ConfigType
+from homeassistant.util import dt as dt_util
+
+from .api import (
+    ApiClientAuthenticationException,
+    ApiClientException,
+    ElviaApiClient,
+)
+from .backfill import ElviaTariffBackfill
+from .batch import ElviaMeteringPointBatcher
+from .const import (
+    CACHE_METERINGPOINT,
+    CONF_CONFIG_ENTRY_ID,
+    CONF_DAYS,
+    CONF_END_DATE,
+    CONF_METERING_POINT_ID,
+    CONF_PERIOD,
+    CONF_REFRESH_OFFSET,
+    CONF_REFRESH_WINDOW,
+    CONF_START_DATE,
+    CONF_TOKEN,
+    DATA_BACKFILL,
+    DATA_BATCHERS,
+    DATA_CACHE,
+    DATA_MAXHOURS,
+    DATA_PRELOADED,
+    DATA_SCHEDULER,
+    DATA_STATISTICS,
+    DATA_TARIFF,
+    DEFAULT_REFRESH_OFFSET,
+    DEFAULT_REFRESH_WINDOW,
+    DOMAIN,
+    LOGGER,
+    MAX_BACKFILL_DAYS,
+    MAX_TARIFF_DAYS,
+    METERINGPOINT_BATCH_TTL,
+    PLATFORMS,
+    SERVICE_BACKFILL_TARIFF_PRICES,
+    SERVICE_GET_TARIFF_HISTORY,
+    SERVICE_GET_TARIFF_PRICES,
+)
+from .coordinator import ElviaDataUpdateCoordinator, ElviaMaxHoursCoordinator
+from .models import TariffType
+from .scheduler import ElviaRefreshScheduler
+from .series import PERIOD_DAY, PERIOD_MONTH
+from .statistics import ElviaStatisticsImporter
+from .store import ElviaCache, ElviaTariffHistory
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+SERVICE_GET_TARIFF_PRICES_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(CONF_DAYS, default=1): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_TARIFF_DAYS)
+        ),
+    }
+)
+
+SERVICE_BACKFILL_TARIFF_PRICES_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(CONF_START_DATE): cv.date,
+        vol.Optional(CONF_END_DATE): cv.date,
+    }
+)
+
+SERVICE_GET_TARIFF_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(CONF_START_DATE): cv.date,
+        vol.Optional(CONF_END_DATE): cv.date,
+        vol.Optional(CONF_PERIOD, default=PERIOD_DAY): vol.In(
+            [PERIOD_DAY, PERIOD_MONTH]
+        ),
+    }
+)
+
+
+def _entry_data(hass: HomeAssistant, call: ServiceCall) -> dict[str, Any]:
+    """Return the data of the loaded entry a service call is for."""
+
+    data = hass.data.get(DOMAIN, {}).get(call.data[CONF_CONFIG_ENTRY_ID])
+    if not isinstance(data, dict) or DATA_TARIFF not in data:
+        raise ServiceValidationError(
+            f"No loaded Elvia entry {call.data[CONF_CONFIG_ENTRY_ID]}"
+        )
+    return data
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Elvia services."""
+
+    async def async_get_tariff_prices(call: ServiceCall) -> ServiceResponse:
+        """Return the energy prices of a config entry in columnar form."""
+        data = _entry_data(hass, call)
+        return data[DATA_TARIFF].tariff_series(call.data[CONF_DAYS])
+
+    async def async_backfill_tariff_prices(call: ServiceCall) -> ServiceResponse:
+        """Store the energy prices of past days for a config entry."""
+
+        data = _entry_data(hass, call)
+        start_date = call.data[CONF_START_DATE]
+        today = dt_util.now().date()
+        end_date = call.data.get(CONF_END_DATE, today)
+        if start_date > end_date:
+            raise ServiceValidationError("start_date is after end_date")
+        if end_date > today:
+            raise ServiceValidationError("end_date is after today")
+        if (end_date - start_date).days >= MAX_BACKFILL_DAYS:
+            raise ServiceValidationError(
+                f"Backfills may cover at most {MAX_BACKFILL_DAYS} days"
+            )
+
+        coordinator = data[DATA_TARIFF]
+        result = await data[DATA_BACKFILL].async_backfill(
+            (coordinator.tariffType or coordinator.device_info).tariffKey,
+            int(coordinator.resolution.total_seconds()),
+            start_date,
+            end_date,
+        )
+
+        # Backfilled hours are older than the last imported one, import them too.
+        result["imported_hours"] = await data[DATA_STATISTICS].async_import(
+            dt_util.start_of_local_day(start_date).timestamp()
+        )
+        return result
+
+    async def async_get_tariff_history(call: ServiceCall) -> ServiceResponse:
+        """Return stored energy prices per day or month in columnar form."""
+
+        data = _entry_data(hass, call)
+        start_date = call.data[CONF_START_DATE]
+        end_date = call.data.get(CONF_END_DATE, dt_util.now().date())
+        if start_date > end_date:
+            raise ServiceValidationError("start_date is after end_date")
+
+        return await data[DATA_BACKFILL].history.async_aggregate(
+            start_date, end_date, call.data[CONF_PERIOD]
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_TARIFF_PRICES,
+        async_get_tariff_prices,
+        schema=SERVICE_GET_TARIFF_PRICES_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
 
-from .api import ElviaApiClient
-from .const import CONF_METERING_POINT_ID, CONF_TOKEN, DOMAIN, LOGGER, PLATFORMS
-from .coordinator import ElviaDataUpdateCoordinator
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BACKFILL_TARIFF_PRICES,
+        async_backfill_tariff_prices,
+        schema=SERVICE_BACKFILL_TARIFF_PRICES_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_TARIFF_HISTORY,
+        async_get_tariff_history,
+        schema=SERVICE_GET_TARIFF_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -17,25 +199,129 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     hass.data.setdefault(DOMAIN, {})
 
+    # One scheduler for all entries, spreading their refreshes.
+    scheduler = hass.data[DOMAIN].setdefault(DATA_SCHEDULER, ElviaRefreshScheduler())
+    scheduler.register(
+        entry.entry_id,
+        entry.data[CONF_API_KEY],
+        entry.options.get(CONF_REFRESH_WINDOW, DEFAULT_REFRESH_WINDOW),
+    )
+    entry.async_on_unload(lambda: scheduler.unregister(entry.entry_id))
+
     api = ElviaApiClient(
         api_key=entry.data[CONF_API_KEY],
         metering_point_id=entry.data[CONF_METERING_POINT_ID],
         token=entry.data[CONF_TOKEN],
         session=async_get_clientsession(hass),
+        request_limit=scheduler.request_limit(entry.data[CONF_API_KEY]),
     )
 
-    data = await api.meteringpoint()
+    # One batcher per api key, shared by every entry using that key.
+    api_key = entry.data[CONF_API_KEY]
+    metering_point_id = entry.data[CONF_METERING_POINT_ID]
+    batchers = hass.data[DOMAIN].setdefault(DATA_BATCHERS, {})
+    batcher = batchers.get(api_key)
+    if batcher is None:
+        batcher = ElviaMeteringPointBatcher(hass, api)
+        batchers[api_key] = batcher
+    batcher.register(metering_point_id)
+
+    @callback
+    def async_unregister() -> None:
+        """Leave the batcher registered with, a reauth may have replaced the key."""
+        batcher.unregister(metering_point_id)
+        if not batcher.metering_point_ids and batchers.get(api_key) is batcher:
+            batchers.pop(api_key)
+
+    entry.async_on_unload(async_unregister)
 
+    cache = ElviaCache(hass, entry.entry_id)
+    await cache.async_load()
+
+    cached = cache.get(CACHE_METERINGPOINT)
+    # Reuse the payload from the config flow if there is one.
+    preloaded = hass.data[DOMAIN].get(DATA_PRELOADED, {}).pop(
+        entry.data[CONF_METERING_POINT_ID], None
+    )
+    if cached is not None:
+        # The tariff type of an outdated payload is good enough for the device,
+        # the payload itself is refreshed in the background after startup.
+        data = cached[0]
+    elif (
+        preloaded is not None
+        and monotonic() - preloaded[0] < METERINGPOINT_BATCH_TTL
+    ):
+        data = preloaded[1]
+    else:
+        try:
+            data = await batcher.async_get(entry.data[CONF_METERING_POINT_ID])
+        except ApiClientAuthenticationException as error:
+            raise ConfigEntryAuthFailed(error) from error
+        except ApiClientException as error:
+            raise ConfigEntryNotReady(error) from error
 
     coordinator = ElviaDataUpdateCoordinator(
         hass=hass,
         api=api,
-        tariffType=data.gridTariff.tariffType,
+        batcher=batcher,
+        cache=cache,
+        scheduler=scheduler,
+        entry_id=entry.entry_id,
+        tariffType=TariffType.from_dict(data["gridTariff"]["tariffType"]),
+        refresh_offset=entry.options.get(CONF_REFRESH_OFFSET, DEFAULT_REFRESH_OFFSET),
     )
+    if cached is None:
+        # Map the payload fetched for setup, so the first refresh needs no request.
+        try:
+            await coordinator.async_use_payload(data)
+        except (KeyError, IndexError, TypeError, ValueError) as error:
+            raise ConfigEntryNotReady(f"Invalid tariff from Elvia: {error}") from error
+        coordinator.update_current_values()
+    elif await coordinator.async_load_cache():
+        coordinator.update_current_values()
 
-    await coordinator.async_config_entry_first_refresh()
+    maxhours_coordinator = ElviaMaxHoursCoordinator(
+        hass=hass,
+        api=api,
+        cache=cache,
+        device_info=coordinator._attr_device_info,
+    )
+    maxhours_fresh = await maxhours_coordinator.async_load_cache()
+
+    async def async_first_refresh() -> None:
+        """Refresh both coordinators in the slot of the entry."""
 
-    hass.data[DOMAIN][entry.entry_id] = coordinator
+        await asyncio.sleep(scheduler.slot(entry.entry_id).total_seconds())
+        refreshes = [coordinator.async_start()]
+        if not maxhours_fresh:
+            refreshes.append(maxhours_coordinator.async_refresh())
+        await asyncio.gather(*refreshes)
+
+    @callback
+    def async_start(_hass: HomeAssistant) -> None:
+        """Refresh once Home Assistant has started, sensors restore until then."""
+        entry.async_create_background_task(
+            hass, async_first_refresh(), f"{DOMAIN} first refresh"
+        )
+
+    entry.async_on_unload(async_at_started(hass, async_start))
+    entry.async_on_unload(coordinator.async_cancel_boundary_refresh)
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
+    history = ElviaTariffHistory(hass, entry.entry_id)
+    statistics = ElviaStatisticsImporter(
+        hass, entry, coordinator, history, entry.data[CONF_METERING_POINT_ID]
+    )
+    # Every tariff refresh imports the hours that have begun since the last one.
+    entry.async_on_unload(coordinator.async_add_listener(statistics.async_schedule))
+
+    hass.data[DOMAIN][entry.entry_id] = {
+        DATA_CACHE: cache,
+        DATA_TARIFF: coordinator,
+        DATA_MAXHOURS: maxhours_coordinator,
+        DATA_BACKFILL: ElviaTariffBackfill(api, history),
+        DATA_STATISTICS: statistics,
+    }
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
@@ -48,13 +334,22 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        data = hass.data[DOMAIN].pop(entry.entry_id)
+        await data[DATA_CACHE].async_flush()
+        await data[DATA_BACKFILL].history.async_flush()
 
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the cached payloads and tariff history of a removed config entry."""
+
+    await ElviaCache(hass, entry.entry_id).async_remove()
+    await ElviaTariffHistory(hass, entry.entry_id).async_remove()
+
+
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Reload config entry."""
 
-    await async_unload_entry(hass, entry)
-    await async_setup_entry(hass, entry)
+    # Through the config entries, so the async_on_unload callbacks run.
+    await hass.config_entries.async_reload(entry.entry_id)
@@ -1,14 +1,23 @@
 """Elvia library."""
 
 from http import HTTPStatus
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
 
 import asyncio
 import async_timeout
 import aiohttp
+import attr
+import json
+import random
 import socket
 
-from datetime import timedelta, date
+from bisect import bisect_left
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlencode
+from time import monotonic
+
+from datetime import datetime, timedelta, timezone
 
 from .const import (
     LOGGER,
@@ -17,13 +26,31 @@ from .const import (
     TARIFFTYPES_PATH,
     TARIFFQUERY_PATH,
     METERINGPOINT_PATH,
+    METERINGPOINT_BATCH_SIZE,
+    RANGE_TODAY,
+    JSON_EXECUTOR_THRESHOLD,
+    DECODE_EXECUTOR_HOURS,
+    LATENCY_BUCKETS,
     API_HEADERS,
+    CACHE_TTLS,
+    HTTP_CACHE_SIZE,
+    CIRCUIT_BREAKER_RESET,
+    CIRCUIT_BREAKER_THRESHOLD,
     MAX_HOURS_PATH,
+    REQUEST_BACKOFF,
+    REQUEST_CONCURRENCY,
+    REQUEST_MAX_RETRY_DELAY,
+    REQUEST_RETRIES,
+    REQUEST_TIMEOUT,
 )
 from .models import (
     TariffType,
     GridTariff,
     GridTariffCollection,
+    decode_grid_tariff,
+    decode_grid_tariff_collection,
+    decode_tariff_query_prices,
+    decode_tariff_types,
 )
 
 
@@ -31,6 +58,186 @@ class ApiClientException(Exception):
     """Api Client Exception."""
 
 
+class ApiClientConnectionException(ApiClientException):
+    """Timeout or connection error."""
+
+
+class ApiClientCircuitOpenException(ApiClientException):
+    """Request skipped while the endpoint is failing."""
+
+
+class ApiClientResponseException(ApiClientException):
+    """Error status in response."""
+
+    def __init__(
+        self, message: str, status: int, retry_after: Optional[float] = None
+    ) -> None:
+        """Initialize."""
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class ApiClientAuthenticationException(ApiClientResponseException):
+    """Credentials were rejected."""
+
+
+class ApiClientUnauthorizedException(ApiClientAuthenticationException):
+    """Status 401 Unauthorized."""
+
+
+class ApiClientForbiddenException(ApiClientAuthenticationException):
+    """Status 403 Forbidden."""
+
+
+class ApiClientRateLimitException(ApiClientResponseException):
+    """Status 429 Too Many Requests."""
+
+
+class ApiClientServerException(ApiClientResponseException):
+    """Status 5xx."""
+
+
+RETRYABLE_EXCEPTIONS = (
+    ApiClientConnectionException,
+    ApiClientRateLimitException,
+    ApiClientServerException,
+)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header, given in seconds or as an HTTP date."""
+
+    if value is None:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+@attr.s(auto_attribs=True, slots=True)
+class CircuitBreaker:
+    """Open after consecutive failed requests, then let one trial request through."""
+
+    failures: int = 0
+    opened_at: Optional[float] = None
+    probing: bool = False
+
+    def allow_request(self) -> bool:
+        """Return if a request may be sent."""
+        if self.opened_at is None:
+            return True
+        if self.probing:
+            return False
+        if monotonic() - self.opened_at >= CIRCUIT_BREAKER_RESET.total_seconds():
+            # Half open, only this request is let through until it ends.
+            self.probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        """Close the circuit."""
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self, probe: bool = False) -> None:
+        """Count a failure, opening the circuit at the threshold or after a trial."""
+        self.failures += 1
+        if probe or self.failures >= CIRCUIT_BREAKER_THRESHOLD:
+            self.opened_at = monotonic()
+        if probe:
+            self.probing = False
+
+    def release(self) -> None:
+        """End a trial request that neither succeeded nor failed."""
+        self.probing = False
+
+
+# Circuit breakers by endpoint, shared by every client in the process.
+_CIRCUIT_BREAKERS: Dict[str, CircuitBreaker] = {}
+
+
+@attr.s(auto_attribs=True, slots=True)
+class EndpointStats:
+    """Request latency histogram, response sizes and statuses of an endpoint."""
+
+    requests: int = 0
+    latency_total: float = 0
+    latency_max: float = 0
+    latency_buckets: List[int] = attr.Factory(
+        lambda: [0] * (len(LATENCY_BUCKETS) + 1)
+    )
+    bytes_total: int = 0
+    bytes_last: int = 0
+    statuses: Dict[str, int] = attr.Factory(dict)
+
+    def record(self, latency: float, status: str, size: int = 0) -> None:
+        """Record one request attempt."""
+        self.requests += 1
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+        self.latency_buckets[bisect_left(LATENCY_BUCKETS, latency)] += 1
+        self.bytes_total += size
+        self.bytes_last = size
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the stats in a JSON serializable form."""
+        return {
+            "requests": self.requests,
+            "latency_mean": self.latency_total / self.requests if self.requests else None,
+            "latency_max": self.latency_max,
+            "latency_histogram": {
+                f"<={bound}": count
+                for bound, count in zip(
+                    (*LATENCY_BUCKETS, "inf"), self.latency_buckets
+                )
+            },
+            "bytes_total": self.bytes_total,
+            "bytes_last": self.bytes_last,
+            "statuses": dict(self.statuses),
+        }
+
+
+# Stats by endpoint, shared by every client as they share the upstream quota.
+_ENDPOINT_STATS: Dict[str, EndpointStats] = {}
+
+
+def endpoint_stats() -> Dict[str, Dict[str, Any]]:
+    """Return the request stats of every endpoint called."""
+    return {endpoint: stats.as_dict() for endpoint, stats in _ENDPOINT_STATS.items()}
+
+
+# Requests in flight, shared by every client in the process. Keyed by method,
+# url, body and headers, so only identical requests with the same credentials
+# are coalesced.
+_IN_FLIGHT: Dict[Tuple[str, str, str, frozenset], asyncio.Future] = {}
+
+
+@attr.s(auto_attribs=True, slots=True)
+class CachedResponse:
+    """A cached GET response and its validators."""
+
+    data: Any
+    expires: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Get headers for a conditional request."""
+        headers = {}
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
 class ElviaApiClient:
     """Main class for handling connection with."""
 
@@ -40,23 +247,79 @@ class ElviaApiClient:
         metering_point_id: str,
         token: str,
         session: Optional[aiohttp.client.ClientSession] = None,
+        json_executor_threshold: int = JSON_EXECUTOR_THRESHOLD,
+        decode_executor_hours: int = DECODE_EXECUTOR_HOURS,
+        cache_ttls: Optional[Dict[str, timedelta]] = None,
+        request_limit: Optional[asyncio.Semaphore] = None,
     ) -> None:
-        """Initialize connection with Elvia."""
+        """Initialize connection with Elvia.
+
+        request_limit is shared by the clients of an api key to cap their
+        concurrent requests.
+        """
 
         self._session = session
+        self._json_executor_threshold = json_executor_threshold
+        self._decode_executor_hours = decode_executor_hours
+        self._cache_ttls = CACHE_TTLS if cache_ttls is None else cache_ttls
+        # Least recently used first, keyed by url and decoder.
+        self._http_cache: OrderedDict[Tuple[str, Any], CachedResponse] = (
+            OrderedDict()
+        )
+        self._request_limit = (
+            asyncio.Semaphore(REQUEST_CONCURRENCY)
+            if request_limit is None
+            else request_limit
+        )
+        self.cache_stats = {"hits": 0, "misses": 0, "revalidations": 0, "coalesced": 0}
         self._api_key = api_key
         self._metering_point_id = metering_point_id
         self._token = token
 
-    async def get(self, url: str, headers) -> Any:
-        """Get request."""
+    async def get(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        decode: Optional[Callable[[Any], Any]] = None,
+        cache: bool = True,
+    ) -> Any:
+        """Get request, answered from the HTTP cache or revalidated when possible.
+
+        decode is applied to the parsed body, in an executor for large bodies
+        or many tariff periods, and the decoded result is cached per url and
+        decoder, so decode should be a module level function. With cache
+        False the response is neither read from nor stored in the cache.
+        """
         t = self.headers_with_api_key() if headers is None else headers
-        return await self.api_wrapper(
+        key = (url, decode)
+
+        cached = self._http_cache.get(key) if cache else None
+        if cached is not None:
+            self._http_cache.move_to_end(key)
+            if monotonic() < cached.expires:
+                self.cache_stats["hits"] += 1
+                return cached.data
+            t = {**t, **cached.conditional_headers()}
+
+        status, response_headers, body = await self._request(
             method="GET",
             url=url,
             headers=t,
         )
 
+        if status == HTTPStatus.NOT_MODIFIED and cached is not None:
+            self.cache_stats["revalidations"] += 1
+            cached.expires = monotonic() + self._cache_ttl(url, response_headers)
+            return cached.data
+
+        self.cache_stats["misses"] += 1
+        result = await self._parse(url, body)
+        if decode is not None:
+            result = await self._decode(decode, result, len(body))
+        if status == HTTPStatus.OK and cache:
+            self._cache_response(key, response_headers, result)
+        return result
+
     async def post(self, url: str, data: dict[str, Any] = {}) -> Any:
         """Post request."""
         return await self.api_wrapper(
@@ -72,6 +335,118 @@ class ElviaApiClient:
     ) -> dict[str, Any] or None:
         """Wrap request."""
 
+        _, _, body = await self._request(
+            method=method, url=url, data=data, headers=headers
+        )
+        return await self._parse(url, body)
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        data: dict[str, Any] = {},
+        headers: dict = {},
+    ) -> Tuple[int, Mapping[str, str], bytes]:
+        """Send a request, returning status, headers and raw body.
+
+        Concurrent identical requests share one upstream call.
+        """
+
+        key = (method, url, repr(data), frozenset(headers.items()))
+        in_flight = _IN_FLIGHT.get(key)
+        if in_flight is not None:
+            self.cache_stats["coalesced"] += 1
+            LOGGER.debug("Joining %s-request in flight to url=%s", method, url)
+        else:
+            in_flight = asyncio.ensure_future(
+                self._send(method=method, url=url, data=data, headers=headers)
+            )
+            _IN_FLIGHT[key] = in_flight
+            in_flight.add_done_callback(lambda _: _IN_FLIGHT.pop(key, None))
+
+        # Shielded, so a cancelled caller does not cancel the request for others.
+        return await asyncio.shield(in_flight)
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        data: dict[str, Any] = {},
+        headers: dict = {},
+    ) -> Tuple[int, Mapping[str, str], bytes]:
+        """Send a request, retrying retryable errors with backoff.
+
+        Fails fast while the circuit breaker of the endpoint is open. The
+        breaker counts one failure per request, not per attempt. Rate limits
+        are not failures, as the quota is per user and not per endpoint.
+        """
+
+        breaker = _CIRCUIT_BREAKERS.setdefault(url.split("?")[0], CircuitBreaker())
+        if not breaker.allow_request():
+            raise ApiClientCircuitOpenException(
+                f"Skipping request to {url}, too many recent failures"
+            )
+        # Only the trial request gets through an open circuit.
+        probe = breaker.opened_at is not None
+
+        try:
+            response = await self._send_with_retries(
+                method=method, url=url, data=data, headers=headers
+            )
+        except ApiClientRateLimitException:
+            # Retry-After paces this user, other users may still be served.
+            raise
+        except RETRYABLE_EXCEPTIONS:
+            breaker.record_failure(probe)
+            raise
+        except ApiClientResponseException:
+            # The endpoint answered, only this request was refused.
+            breaker.record_success()
+            raise
+        finally:
+            if probe:
+                breaker.release()
+
+        breaker.record_success()
+        return response
+
+    async def _send_with_retries(
+        self,
+        method: str,
+        url: str,
+        data: dict[str, Any] = {},
+        headers: dict = {},
+    ) -> Tuple[int, Mapping[str, str], bytes]:
+        """Send a request, retrying retryable errors with backoff."""
+
+        for attempt in range(REQUEST_RETRIES + 1):
+            try:
+                async with self._request_limit:
+                    return await self._send_once(
+                        method=method, url=url, data=data, headers=headers
+                    )
+            except RETRYABLE_EXCEPTIONS as exception:
+                retry_after = getattr(exception, "retry_after", None)
+                delay = (
+                    retry_after
+                    if retry_after is not None
+                    else REQUEST_BACKOFF * 2**attempt * random.uniform(0.5, 1.5)
+                )
+                if attempt == REQUEST_RETRIES or delay > REQUEST_MAX_RETRY_DELAY:
+                    raise
+
+                LOGGER.debug("Retrying %s in %.1f s: %s", url, delay, exception)
+                await asyncio.sleep(delay)
+
+    async def _send_once(
+        self,
+        method: str,
+        url: str,
+        data: dict[str, Any] = {},
+        headers: dict = {},
+    ) -> Tuple[int, Mapping[str, str], bytes]:
+        """Send a request once, raising a typed exception for error statuses."""
+
         LOGGER.debug(
             "%s-request to url=%s. data=%s. headers=%s",
             method,
@@ -80,8 +455,11 @@ class ElviaApiClient:
             headers,
         )
 
+        stats = _ENDPOINT_STATS.setdefault(url.split("?")[0], EndpointStats())
+        start = monotonic()
+
         try:
-            async with async_timeout.timeout(20):
+            async with async_timeout.timeout(REQUEST_TIMEOUT):
                 response = await self._session.request(
                     method=method,
                     url=url,
@@ -92,36 +470,113 @@ class ElviaApiClient:
                 # LOGGER.debug("response=%s", response)
 
                 status = response.status
-                if status == HTTPStatus.OK:
-                    LOGGER.debug("Status 200 OK")
-                elif (
-                    status == HTTPStatus.UNAUTHORIZED
-                ):
-                    # TODO throw specialized exception
-                    LOGGER.debug("Status 401 Unauthorized")
-                elif status == HTTPStatus.FORBIDDEN:
-                    # TODO throw specialized exception
-                    LOGGER.debug("Status 403 Forbidden")
-                else:
-                    LOGGER.debug("Status=%s", status)
-
-                return await response.json()
+                body = await response.read()
 
         except asyncio.TimeoutError as exception:
-            raise ApiClientException(
+            stats.record(monotonic() - start, "timeout")
+            raise ApiClientConnectionException(
                 f"Timeout error fetching information from {url}"
             ) from exception
-        except (KeyError, TypeError) as exception:
-            raise ApiClientException(
-                f"Error parsing information from {url} - {exception}"
-            ) from exception
         except (aiohttp.ClientError, socket.gaierror) as exception:
-            raise ApiClientException(
+            stats.record(monotonic() - start, "error")
+            raise ApiClientConnectionException(
                 f"Error fetching information from {url} - {exception}"
             ) from exception
         except Exception as exception:  # pylint: disable=broad-except
+            stats.record(monotonic() - start, "error")
             raise ApiClientException(exception) from exception
 
+        stats.record(monotonic() - start, str(status), len(body))
+        LOGGER.debug("Status=%s", status)
+
+        if status in (HTTPStatus.OK, HTTPStatus.NOT_MODIFIED):
+            return status, response.headers, body
+
+        message = f"Status {status} from {url}"
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        if status == HTTPStatus.UNAUTHORIZED:
+            raise ApiClientUnauthorizedException(message, status)
+        if status == HTTPStatus.FORBIDDEN:
+            raise ApiClientForbiddenException(message, status)
+        if status == HTTPStatus.TOO_MANY_REQUESTS:
+            raise ApiClientRateLimitException(message, status, retry_after)
+        if status >= HTTPStatus.INTERNAL_SERVER_ERROR:
+            raise ApiClientServerException(message, status, retry_after)
+        raise ApiClientResponseException(message, status)
+
+    async def _parse(self, url: str, body: bytes) -> Any:
+        """Parse a JSON body, in an executor if it is large."""
+
+        try:
+            # Keep large bodies from blocking the event loop while parsing.
+            if len(body) > self._json_executor_threshold:
+                return await asyncio.get_running_loop().run_in_executor(
+                    None, json.loads, body
+                )
+            return json.loads(body)
+        except (KeyError, TypeError, ValueError) as exception:
+            raise ApiClientException(
+                f"Error parsing information from {url} - {exception}"
+            ) from exception
+
+    async def _decode(
+        self, decode: Callable[[Any], Any], data: Any, size: int
+    ) -> Any:
+        """Decode a parsed body, in an executor if it is large or has many periods."""
+
+        try:
+            hours = len(data["gridTariff"]["tariffPrice"]["hours"])
+        except (KeyError, TypeError):
+            hours = 0
+
+        if size > self._json_executor_threshold or hours > self._decode_executor_hours:
+            return await asyncio.get_running_loop().run_in_executor(
+                None, decode, data
+            )
+        return decode(data)
+
+    def _cache_ttl(self, url: str, headers: Mapping[str, str]) -> float:
+        """Return seconds a response may be used without revalidation."""
+
+        override = self._cache_ttls.get(url.split("?")[0])
+        if override is not None:
+            return override.total_seconds()
+
+        for directive in headers.get("Cache-Control", "").split(","):
+            name, _, value = directive.strip().partition("=")
+            if name.lower() == "max-age" and value.isdigit():
+                return float(value)
+        return 0
+
+    def _cache_response(
+        self, key: Tuple[str, Any], headers: Mapping[str, str], data: Any
+    ) -> None:
+        """Cache a response if it can be reused or revalidated.
+
+        The least recently used response is dropped above HTTP_CACHE_SIZE.
+        """
+
+        if "no-store" in headers.get("Cache-Control", "").lower():
+            self._http_cache.pop(key, None)
+            return
+
+        ttl = self._cache_ttl(key[0], headers)
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if ttl <= 0 and etag is None and last_modified is None:
+            self._http_cache.pop(key, None)
+            return
+
+        self._http_cache[key] = CachedResponse(
+            data=data,
+            expires=monotonic() + ttl,
+            etag=etag,
+            last_modified=last_modified,
+        )
+        self._http_cache.move_to_end(key)
+        while len(self._http_cache) > HTTP_CACHE_SIZE:
+            self._http_cache.popitem(last=False)
+
     async def ping(self) -> bool:
         """Ping endpoint."""
         await self.get(PING_PATH)
@@ -131,25 +586,118 @@ class ElviaApiClient:
         """Secure endpoint."""
         return await self.get(SECURE_PATH)
 
-    async def tarifftypes(self) -> List[TariffType]:
+    async def tarifftypes(self) -> Tuple[TariffType, ...]:
         """Get all available private tariff types."""
-        return (
-            TariffType.from_dict(tariffType)
-            for tariffType in await self.get(TARIFFTYPES_PATH)["tariffKey"]
+        return await self.get(
+            TARIFFTYPES_PATH,
+            decode=decode_tariff_types,
         )
 
-    async def tariffquery(self) -> GridTariff:
+    async def tariffquery(
+        self,
+        tariff_key: str,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        query_range: Optional[str] = None,
+    ) -> GridTariff:
         """Get tariff data/prices for a given tariff for a given timeperiod."""
-        return GridTariff.from_dict(await self.get(TARIFFQUERY_PATH))
+        return await self.get(
+            self.tariffquery_url(tariff_key, start_time, end_time, query_range),
+            decode=decode_grid_tariff,
+        )
+
+    async def tariffquery_prices(
+        self, tariff_key: str, start_time: datetime, end_time: datetime
+    ) -> Tuple[Tuple[float, float], ...]:
+        """Get the start epoch and energy price of every hour in a timeperiod.
+
+        Used by backfills, which store the prices themselves, so the response
+        is not cached.
+        """
+        return await self.get(
+            self.tariffquery_url(tariff_key, start_time, end_time),
+            decode=decode_tariff_query_prices,
+            cache=False,
+        )
+
+    @staticmethod
+    def tariffquery_url(
+        tariff_key: str,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        query_range: Optional[str] = None,
+    ) -> str:
+        """Return the tariffquery url for a tariff and a range or timeperiod."""
+
+        params = {"TariffKey": tariff_key}
+        if query_range is not None:
+            params["Range"] = query_range
+        if start_time is not None:
+            params["StartTime"] = start_time.isoformat()
+        if end_time is not None:
+            params["EndTime"] = end_time.isoformat()
+        return f"{TARIFFQUERY_PATH}?{urlencode(params)}"
 
     async def meteringpoint(self) -> GridTariffCollection:
         """Returns tariff(s) and MPID(s) for the MPIDs(MeteringpointId/Målepunkt-Id) given as input."""
-        response = await self.post(
-            METERINGPOINT_PATH,
-            '{ "range": "today", "meteringPointIds": [ "' + str(self._metering_point_id) + '" ] }',
+        return decode_grid_tariff_collection(await self.meteringpoint_data())
+
+    async def meteringpoint_data(self) -> Dict[str, Any]:
+        """Get the undecoded collection for the configured MPID."""
+        collections = await self.meteringpoints_data([self._metering_point_id])
+        try:
+            return collections[str(self._metering_point_id)]
+        except KeyError as exception:
+            raise ApiClientException(
+                f"No tariff returned for meteringpoint {self._metering_point_id}"
+            ) from exception
+
+    async def meteringpoints(
+        self, metering_point_ids: List[str]
+    ) -> Dict[str, GridTariffCollection]:
+        """Get tariffs for many MPIDs."""
+        return {
+            metering_point_id: decode_grid_tariff_collection(collection)
+            for metering_point_id, collection in (
+                await self.meteringpoints_data(metering_point_ids)
+            ).items()
+        }
+
+    async def meteringpoints_data(
+        self, metering_point_ids: List[str], query_range: str = RANGE_TODAY
+    ) -> Dict[str, Dict[str, Any]]:
+        """Get undecoded tariffs for many MPIDs, one request per METERINGPOINT_BATCH_SIZE ids.
+
+        Every MPID gets its own collection, holding only its own price level.
+        query_range is a tariffquery range, such as today or tomorrow.
+        """
+        ids = [str(metering_point_id) for metering_point_id in metering_point_ids]
+        chunks = [
+            ids[index : index + METERINGPOINT_BATCH_SIZE]
+            for index in range(0, len(ids), METERINGPOINT_BATCH_SIZE)
+        ]
+        responses = await asyncio.gather(
+            *(
+                self.post(
+                    METERINGPOINT_PATH,
+                    json.dumps({"range": query_range, "meteringPointIds": chunk}),
+                )
+                for chunk in chunks
+            )
         )
-        for collection in response["gridTariffCollections"]:
-            return GridTariffCollection.from_dict(collection)
+
+        collections: Dict[str, Dict[str, Any]] = {}
+        for response in responses:
+            for collection in response["gridTariffCollections"]:
+                for level in collection["meteringPointsAndPriceLevels"]:
+                    for meteringpoint in level["meteringPoints"]:
+                        collections[meteringpoint["meteringPointId"]] = {
+                            **collection,
+                            "meteringPointsAndPriceLevels": [
+                                {**level, "meteringPoints": [meteringpoint]}
+                            ],
+                        }
+        return collections
 
     async def maxhours(self):
         return await self.get(f"{MAX_HOURS_PATH}?meteringPointIds={str(self._metering_point_id)}", headers=self.headers_with_token())
@@ -0,0 +1,147 @@
+"""Backfill of historical Elvia tariffs through tariffquery."""
+
+from __future__ import annotations
+
+from typing import Any, Collection, Dict, Iterable, List, Tuple
+
+import asyncio
+from datetime import date, timedelta
+
+from homeassistant.util import dt as dt_util
+
+from .api import ElviaApiClient
+from .const import BACKFILL_CHUNK_DAYS, BACKFILL_CONCURRENCY, LOGGER
+from .store import ElviaTariffHistory
+
+
+def backfill_chunks(
+    start_date: date,
+    end_date: date,
+    completed: Collection[str] = (),
+    chunk_days: int = BACKFILL_CHUNK_DAYS,
+) -> List[Tuple[date, date]]:
+    """Split the days from start_date to end_date, both included, into chunks.
+
+    Days in completed, by ISO date, are left out. Chunks are runs of at most
+    chunk_days consecutive missing days.
+    """
+
+    chunks = []
+    chunk_start = None
+    day = start_date
+    while day <= end_date:
+        if day.isoformat() in completed:
+            if chunk_start is not None:
+                chunks.append((chunk_start, day - timedelta(days=1)))
+                chunk_start = None
+        elif chunk_start is None:
+            chunk_start = day
+        elif (day - chunk_start).days == chunk_days:
+            chunks.append((chunk_start, day - timedelta(days=1)))
+            chunk_start = day
+        day += timedelta(days=1)
+
+    if chunk_start is not None:
+        chunks.append((chunk_start, end_date))
+    return chunks
+
+
+def complete_days(
+    prices: Iterable[Tuple[float, float]], resolution: int
+) -> List[str]:
+    """Return the local days, by ISO date, prices are given for every period of.
+
+    resolution is the length of a tariff period in seconds.
+    """
+
+    periods: Dict[date, int] = {}
+    for start in {start for start, _ in prices}:
+        day = dt_util.as_local(dt_util.utc_from_timestamp(start)).date()
+        periods[day] = periods.get(day, 0) + 1
+
+    return [
+        day.isoformat()
+        for day, count in periods.items()
+        if count * resolution
+        >= dt_util.start_of_local_day(day + timedelta(days=1)).timestamp()
+        - dt_util.start_of_local_day(day).timestamp()
+    ]
+
+
+class ElviaTariffBackfill:
+    """Fetch the tariff of a date range in chunks, BACKFILL_CONCURRENCY at a time.
+
+    Prices are stored as each chunk arrives, and days with every period in the
+    history are skipped, so a backfill can be interrupted and run again.
+    """
+
+    def __init__(
+        self,
+        api: ElviaApiClient,
+        history: ElviaTariffHistory,
+        chunk_days: int = BACKFILL_CHUNK_DAYS,
+        concurrency: int = BACKFILL_CONCURRENCY,
+    ) -> None:
+        """Initialize."""
+
+        self.api = api
+        self.history = history
+        self._chunk_days = chunk_days
+        self._concurrency = concurrency
+        self._lock = asyncio.Lock()
+
+    async def async_backfill(
+        self, tariff_key: str, resolution: int, start_date: date, end_date: date
+    ) -> Dict[str, Any]:
+        """Backfill a tariff for the days from start_date to end_date, both included.
+
+        resolution is the length of a tariff period in seconds.
+        """
+
+        # One backfill at a time per entry, a second one resumes after the first.
+        async with self._lock:
+            if not self.history.loaded:
+                await self.history.async_load()
+            await self.history.async_reset(tariff_key)
+
+            chunks = backfill_chunks(
+                start_date, end_date, self.history.completed, self._chunk_days
+            )
+            LOGGER.debug(
+                "Backfilling %s chunks of %s tariff from %s to %s",
+                len(chunks),
+                tariff_key,
+                start_date,
+                end_date,
+            )
+
+            semaphore = asyncio.Semaphore(self._concurrency)
+            hours = 0
+            errors = 0
+
+            async def async_fetch(chunk: Tuple[date, date]) -> int:
+                async with semaphore:
+                    prices = await self.api.tariffquery_prices(
+                        tariff_key,
+                        dt_util.start_of_local_day(chunk[0]),
+                        dt_util.start_of_local_day(chunk[1] + timedelta(days=1)),
+                    )
+                # Days missing periods are fetched again by the next backfill.
+                await self.history.async_add(
+                    complete_days(prices, resolution), prices, resolution
+                )
+                return len(prices)
+
+            for fetch in asyncio.as_completed([async_fetch(chunk) for chunk in chunks]):
+                try:
+                    hours += await fetch
+                except Exception as error:  # pylint: disable=broad-except
+                    LOGGER.warning("Tariff backfill chunk failed: %s", error)
+                    errors += 1
+
+            return {
+                "chunks": len(chunks),
+                "failed_chunks": errors,
+                "hours": hours,
+                "stored_hours": self.history.count,
+            }
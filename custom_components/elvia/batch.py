@@ -0,0 +1,131 @@
+"""Batching of meteringpointsgridtariffs requests for Elvia."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Set, Tuple
+
+import asyncio
+from time import monotonic
+
+from homeassistant.core import HomeAssistant
+
+from .api import ApiClientException, ElviaApiClient
+from .const import (
+    LOGGER,
+    METERINGPOINT_BATCH_DELAY,
+    METERINGPOINT_BATCH_TTL,
+    RANGE_TODAY,
+)
+
+
+class ElviaMeteringPointBatcher:
+    """Share one meteringpointsgridtariffs request between all entries of an api key.
+
+    The first coordinator asking for its tariff starts a short collection window.
+    When it closes, one request is sent for every registered MPID, and results
+    for coordinators that have not asked yet are kept for METERINGPOINT_BATCH_TTL.
+    Every range, such as today or tomorrow, is batched on its own.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: ElviaApiClient,
+        delay: float = METERINGPOINT_BATCH_DELAY,
+        ttl: float = METERINGPOINT_BATCH_TTL,
+    ) -> None:
+        """Initialize."""
+
+        self.hass = hass
+        self.api = api
+        self._delay = delay
+        self._ttl = ttl
+        self._metering_point_ids: Set[str] = set()
+        self._waiting: Dict[Tuple[str, str], List[asyncio.Future]] = {}
+        self._results: Dict[Tuple[str, str], tuple[float, Dict[str, Any]]] = {}
+        self._flush_tasks: Dict[str, asyncio.Task] = {}
+
+    @property
+    def metering_point_ids(self) -> Set[str]:
+        """Return the registered MPIDs."""
+        return self._metering_point_ids
+
+    def register(self, metering_point_id: str) -> None:
+        """Include a MPID in every batched request."""
+        self._metering_point_ids.add(str(metering_point_id))
+
+    def unregister(self, metering_point_id: str) -> None:
+        """Stop fetching a MPID."""
+        self._metering_point_ids.discard(str(metering_point_id))
+        for key in [key for key in self._results if key[1] == str(metering_point_id)]:
+            self._results.pop(key)
+
+    async def async_get(
+        self, metering_point_id: str, query_range: str = RANGE_TODAY
+    ) -> Dict[str, Any]:
+        """Get the undecoded collection for a MPID, sharing the request with other MPIDs."""
+
+        key = (query_range, str(metering_point_id))
+
+        cached = self._results.pop(key, None)
+        if cached is not None and monotonic() - cached[0] < self._ttl:
+            return cached[1]
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiting.setdefault(key, []).append(future)
+
+        if query_range not in self._flush_tasks:
+            self._flush_tasks[query_range] = self.hass.async_create_task(
+                self._async_flush(query_range)
+            )
+
+        return await future
+
+    async def _async_flush(self, query_range: str) -> None:
+        """Send one batched request for a range after the collection window."""
+
+        await asyncio.sleep(self._delay)
+
+        waiting = {
+            key[1]: self._waiting.pop(key)
+            for key in list(self._waiting)
+            if key[0] == query_range
+        }
+        self._flush_tasks.pop(query_range, None)
+
+        metering_point_ids = sorted(self._metering_point_ids | set(waiting))
+        LOGGER.debug(
+            "Batched %s tariff request for %s meteringpoints",
+            query_range,
+            len(metering_point_ids),
+        )
+
+        try:
+            collections = await self.api.meteringpoints_data(
+                metering_point_ids, query_range
+            )
+        except Exception as exception:  # pylint: disable=broad-except
+            for futures in waiting.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(exception)
+            return
+
+        fetched = monotonic()
+        for metering_point_id, collection in collections.items():
+            if metering_point_id not in waiting:
+                self._results[(query_range, metering_point_id)] = (fetched, collection)
+
+        for metering_point_id, futures in waiting.items():
+            collection = collections.get(metering_point_id)
+            for future in futures:
+                if future.done():
+                    continue
+                if collection is None:
+                    future.set_exception(
+                        ApiClientException(
+                            f"No tariff returned for meteringpoint {metering_point_id}"
+                        )
+                    )
+                else:
+                    future.set_result(collection)
@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict
+from typing import Any, Dict, Mapping
+
+from time import monotonic
 
 import voluptuous as vol
 
@@ -12,8 +14,17 @@ from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .api import ElviaApiClient
-from .const import CONF_METERING_POINT_ID, DOMAIN, CONF_TOKEN
+from .api import ApiClientAuthenticationException, ElviaApiClient
+from .const import (
+    CONF_METERING_POINT_ID,
+    CONF_REFRESH_OFFSET,
+    CONF_REFRESH_WINDOW,
+    CONF_TOKEN,
+    DATA_PRELOADED,
+    DEFAULT_REFRESH_OFFSET,
+    DEFAULT_REFRESH_WINDOW,
+    DOMAIN,
+)
 
 SCHEMA = vol.Schema(
     {
@@ -29,6 +40,16 @@ class ElviaFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    reauth_entry: config_entries.ConfigEntry | None = None
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> ElviaOptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return ElviaOptionsFlowHandler(config_entry)
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -48,7 +69,13 @@ class ElviaFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             )
 
             try:
-                await api.meteringpoint()
+                collection = await api.meteringpoint_data()
+            except ApiClientAuthenticationException:
+                return self.async_show_form(
+                    step_id="user",
+                    data_schema=SCHEMA,
+                    errors={"base": "invalid_auth"},
+                )
             except Exception:
                 return self.async_show_form(
                     step_id="user",
@@ -56,6 +83,11 @@ class ElviaFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
                     errors={"base": "cannot_connect"},
                 )
 
+            # Let async_setup_entry reuse the validated payload.
+            self.hass.data.setdefault(DOMAIN, {}).setdefault(DATA_PRELOADED, {})[
+                str(metering_point_id)
+            ] = (monotonic(), collection)
+
             return self.async_create_entry(
                 title="Elvia",
                 data=user_input,
@@ -66,3 +98,96 @@ class ElviaFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             data_schema=SCHEMA,
             errors={},
         )
+
+    async def async_step_reauth(self, entry_data: Mapping[str, Any]) -> FlowResult:
+        """Handle rejected api key or token."""
+
+        self.reauth_entry = self.hass.config_entries.async_get_entry(
+            self.context["entry_id"]
+        )
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Ask for new credentials."""
+
+        assert self.reauth_entry is not None
+        errors: Dict[str, str] = {}
+
+        if user_input is not None:
+            data = {**self.reauth_entry.data, **user_input}
+
+            api = ElviaApiClient(
+                api_key=data[CONF_API_KEY],
+                metering_point_id=data[CONF_METERING_POINT_ID],
+                token=data[CONF_TOKEN],
+                session=async_get_clientsession(self.hass),
+            )
+
+            try:
+                await api.meteringpoint_data()
+                await api.maxhours()
+            except ApiClientAuthenticationException:
+                errors["base"] = "invalid_auth"
+            except Exception:
+                errors["base"] = "cannot_connect"
+            else:
+                self.hass.config_entries.async_update_entry(
+                    self.reauth_entry, data=data
+                )
+                await self.hass.config_entries.async_reload(
+                    self.reauth_entry.entry_id
+                )
+                return self.async_abort(reason="reauth_successful")
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_API_KEY, default=self.reauth_entry.data[CONF_API_KEY]
+                    ): str,
+                    vol.Required(
+                        CONF_TOKEN, default=self.reauth_entry.data[CONF_TOKEN]
+                    ): str,
+                }
+            ),
+            errors=errors,
+        )
+
+
+class ElviaOptionsFlowHandler(config_entries.OptionsFlow):
+    """Options flow for Elvia."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize options flow."""
+        self.config_entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_REFRESH_OFFSET,
+                        default=self.config_entry.options.get(
+                            CONF_REFRESH_OFFSET, DEFAULT_REFRESH_OFFSET
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=600)),
+                    vol.Optional(
+                        CONF_REFRESH_WINDOW,
+                        default=self.config_entry.options.get(
+                            CONF_REFRESH_WINDOW, DEFAULT_REFRESH_WINDOW
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=900)),
+                }
+            ),
+        )
@@ -1,5 +1,6 @@
 """Constants for the Elvia integration."""
 
+from datetime import time, timedelta
 from logging import Logger, getLogger
 
 LOGGER: Logger = getLogger(__package__)
@@ -8,10 +9,99 @@ DOMAIN = "elvia"
 PLATFORMS = ["sensor"]
 
 CONF_TOKEN = "token"
+CONF_CONFIG_ENTRY_ID = "config_entry_id"
+
+SERVICE_GET_TARIFF_PRICES = "get_tariff_prices"
+CONF_DAYS = "days"
+CONF_START_DATE = "start_date"
+CONF_END_DATE = "end_date"
+SERVICE_BACKFILL_TARIFF_PRICES = "backfill_tariff_prices"
+SERVICE_GET_TARIFF_HISTORY = "get_tariff_history"
+CONF_PERIOD = "period"
+# Most days of prices the get_tariff_prices service computes
+MAX_TARIFF_DAYS = 7
 CONF_METERING_POINT_ID = "metering_point_id"
 
 DATE_FORMAT = "%Y-%m-%dT%H:%M:%S"
 
+CONF_REFRESH_OFFSET = "refresh_offset"
+CONF_REFRESH_WINDOW = "refresh_window"
+
+# Seconds after each tariff period boundary before refreshing
+DEFAULT_REFRESH_OFFSET = 10
+# Seconds over which the refreshes of entries with different api keys are spread
+DEFAULT_REFRESH_WINDOW = 60
+# Minutes between tariff periods when the tariff type does not say
+DEFAULT_RESOLUTION = 60
+# Delay before retrying a failed refresh
+RETRY_INTERVAL = timedelta(minutes=1)
+# Maxhours change as consumption data arrives, independent of the tariff
+MAXHOURS_UPDATE_INTERVAL = timedelta(hours=1)
+
+STORAGE_VERSION = 1
+# Seconds to collect changes before writing the cache to disk
+STORAGE_SAVE_DELAY = 10
+
+CACHE_METERINGPOINT = "meteringpoint"
+CACHE_MAXHOURS = "maxhours"
+CACHE_TARIFF_PROFILE = "tariff_profile"
+# The learned tariff profile is kept until the tariff type changes
+TARIFF_PROFILE_TTL = timedelta(days=365)
+
+DATA_CACHE = "cache"
+DATA_BACKFILL = "backfill"
+DATA_STATISTICS = "statistics"
+DATA_TARIFF = "tariff"
+DATA_MAXHOURS = "maxhours"
+
+# Seconds before a single request attempt times out
+REQUEST_TIMEOUT = 10
+# Retries of timeouts, connection errors, 429 and 5xx responses
+REQUEST_RETRIES = 3
+# Seconds before the first retry, doubled for every retry and jittered
+REQUEST_BACKOFF = 1
+# Give up instead of retrying when asked to wait longer than this many seconds
+REQUEST_MAX_RETRY_DELAY = 30
+# Concurrent requests to Elvia per api key
+REQUEST_CONCURRENCY = 2
+# Consecutive failed requests, after their retries, before an endpoint is skipped,
+# not counting rate limited requests as the quota is per user
+CIRCUIT_BREAKER_THRESHOLD = 5
+# Time before a request to a failing endpoint is tried again
+CIRCUIT_BREAKER_RESET = timedelta(minutes=5)
+
+# Upper bounds in seconds of the request latency histogram buckets
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Response bodies larger than this many bytes are parsed in an executor
+JSON_EXECUTOR_THRESHOLD = 256 * 1024
+# Payloads with more tariff periods than this are decoded in an executor
+DECODE_EXECUTOR_HOURS = 24 * 7
+
+DATA_BATCHERS = "batchers"
+DATA_SCHEDULER = "scheduler"
+DATA_PRELOADED = "preloaded"
+
+# Days of tariff history fetched in one tariffquery request by a backfill
+BACKFILL_CHUNK_DAYS = 7
+# Backfill chunks fetched and decoded at the same time
+BACKFILL_CONCURRENCY = 4
+# Most days of tariff history a single backfill may cover
+MAX_BACKFILL_DAYS = 366
+
+# Ranges of meteringpointsgridtariffs requests
+RANGE_TODAY = "today"
+RANGE_TOMORROW = "tomorrow"
+# Local time from which the tariff of the next day is fetched
+TOMORROW_TARIFF_TIME = time(hour=12)
+
+# Max number of metering point ids sent in one meteringpointsgridtariffs request
+METERINGPOINT_BATCH_SIZE = 50
+# Seconds to wait for other coordinators before sending a batched request
+METERINGPOINT_BATCH_DELAY = 0.5
+# Seconds a batched result is kept for coordinators that did not ask for it yet
+METERINGPOINT_BATCH_TTL = 120
+
 # API
 API_BASE: str = "https://elvia.azure-api.net"
 
@@ -21,14 +111,19 @@ MAX_HOURS_PATH = f"{METER_VALUE_API_URL}/api/v2/maxhours" # GET
 GRID_TARIFF_API_URL: str = f"{API_BASE}/grid-tariff"
 API_HEADERS = {
     "Content-Type": "application/json",
-    "Cache-Control": "no-cache",
 }
 PING_PATH = f"{GRID_TARIFF_API_URL}/Ping"  # GET
 SECURE_PATH = f"{GRID_TARIFF_API_URL}/Secure"  # GET
 TARIFFTYPES_PATH = f"{GRID_TARIFF_API_URL}/digin/api/1/tarifftype"  # GET - {v}
-# TODO add tariffKey and range
 TARIFFQUERY_PATH = f"{GRID_TARIFF_API_URL}/digin/api/1/tariffquery"  # ?TariffKey={TariffKey}[&Range][&StartTime][&EndTime]" # GET
 METERINGPOINT_PATH = (
     f"{GRID_TARIFF_API_URL}/digin/api/1/tariffquery/meteringpointsgridtariffs"  # POST
 )
 
+
+# Most GET responses kept in the HTTP cache of a client
+HTTP_CACHE_SIZE = 32
+# How long GET responses are reused without revalidation, overrides max-age
+CACHE_TTLS = {
+    TARIFFTYPES_PATH: timedelta(days=1),
+}
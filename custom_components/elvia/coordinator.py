@@ -1,27 +1,164 @@
 """Elvia data coordinator."""
 
-from typing import Any
+from typing import Any, Callable
 
-from time import localtime
-from datetime import timedelta, datetime
-
-from aiohttp.client_exceptions import ClientConnectorError
-from voluptuous.error import Error
+from array import array
+from bisect import bisect_left, bisect_right
+from time import perf_counter
+from datetime import date, timedelta, datetime
 
 from homeassistant.const import STATE_UNKNOWN
-from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.event import async_track_point_in_utc_time
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-
-from .api import ElviaApiClient
-from .const import DOMAIN, LOGGER
-from .models import EnergyPrice, GridTariffCollection, HourPrice, PriceLevel, TariffType
-
-
-class ElviaDataUpdateCoordinator(DataUpdateCoordinator):
-    """Class to manage fetching from Elvia data API."""
-
-    last_hour_fetched: int or None = None
+from homeassistant.util import dt as dt_util
+
+from .api import ApiClientAuthenticationException, ElviaApiClient
+from .batch import ElviaMeteringPointBatcher
+from .const import (
+    CACHE_MAXHOURS,
+    CACHE_METERINGPOINT,
+    CACHE_TARIFF_PROFILE,
+    DECODE_EXECUTOR_HOURS,
+    DEFAULT_REFRESH_OFFSET,
+    DEFAULT_RESOLUTION,
+    DOMAIN,
+    LOGGER,
+    MAXHOURS_UPDATE_INTERVAL,
+    RANGE_TODAY,
+    RANGE_TOMORROW,
+    RETRY_INTERVAL,
+    TARIFF_PROFILE_TTL,
+    TOMORROW_TARIFF_TIME,
+)
+from .models import (
+    GridTariffCollection,
+    PriceInfo,
+    TariffPrice,
+    TariffType,
+    decode_grid_tariff_collection,
+)
+from .scheduler import ElviaRefreshScheduler
+from .store import ElviaCache
+from .tariff import TariffEngine
+
+NO_FIXED_PRICE: dict[str, Any] = {
+    "fixed_price_hourly": None,
+    "fixed_price_level_info": None,
+    "fixed_price_level": None,
+}
+
+
+def build_fixed_price_index(
+    price_info: PriceInfo,
+) -> dict[tuple[str, str], dict[str, Any]]:
+    """Index fixed prices by (FixedPriceHour.id, PriceLevel.id) in one pass."""
+
+    index = {}
+    for fixed_price_element in price_info.fixedPrices:
+        for price_levels_element in fixed_price_element.priceLevels:
+            hour_prices = price_levels_element.hourPrices
+            hour_price = hour_prices[0] if hour_prices else None
+            index[(fixed_price_element.id, price_levels_element.id)] = {
+                "fixed_price_hourly": None if hour_price is None else hour_price.total,
+                "fixed_price_level_info": price_levels_element.levelInfo,
+                "fixed_price_level": price_levels_element.monthlyTotal,
+            }
+    return index
+
+
+def merge_payloads(
+    data: dict[str, Any], later: dict[str, Any], since: float
+) -> dict[str, Any]:
+    """Return a payload with the tariff periods and prices of a later payload added.
+
+    Periods ending at or before the epoch since are dropped.
+    """
+
+    tariff_price = data["gridTariff"]["tariffPrice"]
+    later_price = later["gridTariff"]["tariffPrice"]
+
+    hours = {
+        hour["startTime"]: hour
+        for hour in (*tariff_price["hours"], *later_price["hours"])
+        if dt_util.parse_datetime(hour["expiredAt"]).timestamp() > since
+    }
+
+    price_info = {}
+    for key, prices in tariff_price["priceInfo"].items():
+        by_id = {price["id"]: price for price in prices}
+        for price in later_price["priceInfo"].get(key, []):
+            by_id.setdefault(price["id"], price)
+        price_info[key] = list(by_id.values())
+
+    return {
+        **later,
+        "gridTariff": {
+            **later["gridTariff"],
+            "tariffPrice": {
+                **later_price,
+                "hours": list(hours.values()),
+                "priceInfo": price_info,
+            },
+        },
+    }
+
+
+class ElviaCoordinator(DataUpdateCoordinator):
+    """Base for Elvia coordinators, timing refreshes and mapping."""
+
+    refresh_time: float or None = None
+    mapping_time: float or None = None
+    auth_failed: bool = False
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize."""
+        super().__init__(*args, **kwargs)
+        self.entity_updates: dict[str, int] = {}
+        self.changed_fields: set[str] = set()
+        self._field_values: dict[str, Any] = {}
+
+    async def _async_update_data(self) -> Any:
+        """Update data, keeping the refresh time."""
+        start = perf_counter()
+        try:
+            return await self._async_fetch_data()
+        finally:
+            self.refresh_time = perf_counter() - start
+
+    async def _async_fetch_data(self) -> Any:
+        """Fetch and map data."""
+        raise NotImplementedError
+
+    def performance(self) -> dict[str, Any]:
+        """Return the timings of the last refresh, in seconds."""
+        return {
+            "refresh_time": self.refresh_time,
+            "mapping_time": self.mapping_time,
+        }
+
+    def fields(self) -> dict[str, Any]:
+        """Return the derived values entities subscribe to, by field name."""
+        return self.performance()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Publish which fields changed since the last update, then notify entities."""
+
+        values = self.fields()
+        self.changed_fields = {
+            field
+            for field in values.keys() | self._field_values.keys()
+            if values.get(field) != self._field_values.get(field)
+        }
+        self._field_values = values
+        super().async_update_listeners()
+
+
+class ElviaDataUpdateCoordinator(ElviaCoordinator):
+    """Class to manage fetching tariffs from Elvia data API."""
 
     tariffType: TariffType or None = None
 
@@ -30,23 +167,43 @@ class ElviaDataUpdateCoordinator(DataUpdateCoordinator):
     fixed_price_level_info: str or None = None
     fixed_price_level: int or None = None
 
-    tariff_prices: Any or None = None
+    fixed_price_index: dict[tuple[str, str], dict[str, Any]] or None = None
+    fixed_price_level_id: str or None = None
+    # Tariff periods of the payload as parallel columns, sorted by start epoch.
+    hour_starts: array or None = None
+    hour_ends: array or None = None
+    energy_prices: array or None = None
+    fixed_price_ids: list[str] or None = None
 
-    maxhours: Any or None = None
-    mapped_maxhours: Any or None = None
-    meteringpoint: GridTariffCollection
+    engine: TariffEngine or None = None
 
+    meteringpoint: GridTariffCollection or None = None
+    payload: dict[str, Any] or None = None
+    fetched_date: date or None = None
+    decode_time: float or None = None
 
     def __init__(
         self,
         hass: HomeAssistant,
         api: ElviaApiClient,
+        batcher: ElviaMeteringPointBatcher,
+        cache: ElviaCache,
+        scheduler: ElviaRefreshScheduler,
+        entry_id: str,
         tariffType: TariffType,
+        refresh_offset: float = DEFAULT_REFRESH_OFFSET,
     ) -> None:
         """Initialize."""
 
         self.api = api
+        self.batcher = batcher
+        self.cache = cache
+        self.scheduler = scheduler
+        self.entry_id = entry_id
         self.device_info = tariffType
+        self.refresh_offset = timedelta(seconds=refresh_offset)
+        self.next_refresh: datetime or None = None
+        self._unsub_boundary: Callable[[], None] or None = None
 
         self._attr_device_info = DeviceInfo(
             name=self.device_info.title,
@@ -60,34 +217,478 @@ class ElviaDataUpdateCoordinator(DataUpdateCoordinator):
             hass,
             LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(minutes=1),
+            # Refreshes are scheduled at tariff period boundaries instead.
+            update_interval=None,
         )
 
-    async def _async_update_data(self) -> GridTariffCollection:
-        """Update data via library."""
+    @property
+    def resolution(self) -> timedelta:
+        """Return the length of a tariff period."""
+        resolution = (self.tariffType or self.device_info).resolution
+        return timedelta(minutes=resolution if resolution > 0 else DEFAULT_RESOLUTION)
+
+    def next_boundary(self, now: datetime) -> datetime:
+        """Return the next tariff period boundary after now, offset and slot included."""
+        offset = self.refresh_offset + self.scheduler.slot(self.entry_id)
+        period = self.resolution.total_seconds()
+        timestamp = now.timestamp() - offset.total_seconds()
+        boundary = (timestamp // period + 1) * period
+        return dt_util.utc_from_timestamp(boundary) + offset
+
+    @callback
+    def async_schedule_boundary_refresh(self) -> None:
+        """Schedule the next refresh, soon after a failure or else at the next boundary."""
 
-        # Only update values once every hour, at the start of the hour.
-        current_hour = datetime.now().time().hour
-        if current_hour == self.last_hour_fetched:
+        self.async_cancel_boundary_refresh()
+
+        if self.auth_failed:
             return
+
+        now = dt_util.utcnow()
+        if self.last_update_success:
+            self.next_refresh = self.next_boundary(now)
         else:
-            self.last_hour_fetched = current_hour
+            self.next_refresh = now + RETRY_INTERVAL
 
-        try:
-            self.meteringpoint = await self.api.meteringpoint()
-            self.maxhours = await self.api.maxhours()
+        self._unsub_boundary = async_track_point_in_utc_time(
+            self.hass, self._async_handle_boundary, self.next_refresh
+        )
 
-            await self.map_meteringpoint_values(self.meteringpoint)
-            await self.map_maxhour_values(self.maxhours)
+    @callback
+    def async_cancel_boundary_refresh(self) -> None:
+        """Stop scheduled refreshes."""
+        if self._unsub_boundary is not None:
+            self._unsub_boundary()
+            self._unsub_boundary = None
+
+    async def _async_handle_boundary(self, _now: datetime) -> None:
+        """Refresh, or only update current values, at a tariff period boundary."""
+        self._unsub_boundary = None
+        await self.async_start()
+
+    async def async_start(self) -> None:
+        """Refresh now and then at every tariff period boundary."""
+        await self.async_refresh()
+        self.async_schedule_boundary_refresh()
+
+    @property
+    def covered_date(self) -> date or None:
+        """Return the last local day the mapped tariff periods cover."""
+        if not self.hour_ends:
+            return None
+        return dt_util.as_local(dt_util.utc_from_timestamp(self.hour_ends[-1] - 1)).date()
+
+    async def _async_fetch_data(self) -> GridTariffCollection:
+        """Update data via library.
+
+        The tariff for the day is known in advance, so it is only fetched when
+        the mapped periods do not cover the current tariff period. The tariff
+        of the next day is added once a day from TOMORROW_TARIFF_TIME.
+        """
+
+        now = dt_util.now()
+        covered_date = self.covered_date
+        if (
+            covered_date is not None
+            and covered_date >= now.date()
+            and self.update_current_values()
+        ):
+            if covered_date == now.date() and now.time() >= TOMORROW_TARIFF_TIME:
+                await self.async_fetch_tomorrow()
+            return self._data()
 
-            return {
-                'meteringpoint': self.meteringpoint,
-                'maxhours': self.maxhours,
-            }
-        except (Error, ClientConnectorError) as error:
+        try:
+            data = await self._async_get_payload(RANGE_TODAY)
+            await self.async_use_payload(data)
+        except ConfigEntryAuthFailed:
+            raise
+        except Exception as error:  # pylint: disable=broad-except
             LOGGER.error("Update error %s", error)
             raise UpdateFailed(error) from error
 
+        if not self.update_current_values():
+            LOGGER.warning("No tariff found for the current period")
+
+        return self._data()
+
+    async def async_fetch_tomorrow(self) -> None:
+        """Add the tariff of the next day to the mapped periods, if it is published.
+
+        Failures keep the tariff of today, the next refresh tries again.
+        """
+
+        try:
+            tomorrow = await self._async_get_payload(RANGE_TOMORROW)
+            if not tomorrow["gridTariff"]["tariffPrice"]["hours"]:
+                LOGGER.debug("The tariff of tomorrow is not published yet")
+                return
+            await self.async_use_payload(
+                merge_payloads(
+                    self.payload, tomorrow, dt_util.start_of_local_day().timestamp()
+                )
+            )
+        except ConfigEntryAuthFailed:
+            raise
+        except Exception as error:  # pylint: disable=broad-except
+            LOGGER.warning("Failed to fetch the tariff of tomorrow: %s", error)
+
+    async def _async_get_payload(self, query_range: str) -> dict[str, Any]:
+        """Get the undecoded collection of a range from the batcher."""
+
+        try:
+            return await self.batcher.async_get(
+                self.api._metering_point_id, query_range
+            )
+        except ApiClientAuthenticationException as error:
+            # Stop refreshing until the api key is replaced in a reauth flow.
+            self.auth_failed = True
+            raise ConfigEntryAuthFailed(error) from error
+
+    async def async_use_payload(self, data: dict[str, Any]) -> None:
+        """Decode and map a payload, and cache it until the last day it covers ends."""
+
+        self.meteringpoint = await self.async_decode(data)
+        await self.map_meteringpoint_values(self.meteringpoint)
+        self.payload = data
+        self.fetched_date = dt_util.now().date()
+
+        self.cache.set(
+            CACHE_METERINGPOINT,
+            data,
+            dt_util.start_of_local_day(
+                (self.covered_date or dt_util.now().date()) + timedelta(days=1)
+            ),
+        )
+
+    async def async_load_cache(self) -> bool:
+        """Map the cached payload if it is still valid, without any request."""
+
+        cached = self.cache.get(CACHE_METERINGPOINT)
+        if cached is None or not cached[1]:
+            return False
+
+        self.meteringpoint = await self.async_decode(cached[0])
+        await self.map_meteringpoint_values(self.meteringpoint)
+        self.payload = cached[0]
+        self.fetched_date = dt_util.as_local(self.cache.fetched(CACHE_METERINGPOINT)).date()
+        return True
+
+    async def async_decode(self, data: dict[str, Any]) -> GridTariffCollection:
+        """Decode a payload and keep the decode time.
+
+        Payloads with many tariff periods are decoded in an executor.
+        """
+        start = perf_counter()
+        if len(data["gridTariff"]["tariffPrice"]["hours"]) > DECODE_EXECUTOR_HOURS:
+            collection = await self.hass.async_add_executor_job(
+                decode_grid_tariff_collection, data
+            )
+        else:
+            collection = decode_grid_tariff_collection(data)
+        self.decode_time = perf_counter() - start
+        return collection
+
+    def performance(self) -> dict[str, Any]:
+        """Return the timings of the last refresh, in seconds."""
+        return {**super().performance(), "decode_time": self.decode_time}
+
+    def fields(self) -> dict[str, Any]:
+        """Return the current values and timings, by field name."""
+        return {
+            **super().fields(),
+            "energy_price": self.energy_price,
+            "fixed_price_hourly": self.fixed_price_hourly,
+            "fixed_price_level_info": self.fixed_price_level_info,
+            "fixed_price_level": self.fixed_price_level,
+        }
+
+    def _data(self) -> dict[str, Any]:
+        return {
+            'meteringpoint': self.meteringpoint,
+        }
+
+    async def map_meteringpoint_values(self, data) -> None:
+        """Map values for every tariff period in the payload."""
+
+        start = perf_counter()
+        self.tariffType = data.gridTariff.tariffType
+
+        tariff_price = data.gridTariff.tariffPrice
+        self.fixed_price_index = build_fixed_price_index(tariff_price.priceInfo)
+
+        first_metering_point = data.meteringPointsAndPriceLevels[0]
+        self.fixed_price_level_id = first_metering_point.currentFixedPriceLevel.levelId
+
+        hours = sorted(
+            (
+                (dt_util.parse_datetime(hour.startTime).timestamp(), hour)
+                for hour in tariff_price.hours
+            ),
+            key=lambda item: item[0],
+        )
+
+        # Epoch based start/end columns for bisect lookups, correct across DST.
+        self.hour_starts = array("d", [start for start, _ in hours])
+        self.hour_ends = array(
+            "d",
+            [dt_util.parse_datetime(hour.expiredAt).timestamp() for _, hour in hours],
+        )
+        self.energy_prices = array("d", [hour.energyPrice.total for _, hour in hours])
+        self.fixed_price_ids = [hour.fixedPrice.id for _, hour in hours]
+        self.engine = self.learn_tariff(tariff_price)
+        self.mapping_time = perf_counter() - start
+
+    def learn_tariff(self, tariff_price: TariffPrice) -> TariffEngine:
+        """Check the cached tariff profile against the payload and learn from it."""
+
+        cached = self.cache.get(CACHE_TARIFF_PROFILE)
+        learned = {}
+        if cached is not None and cached[0]["tariffKey"] == self.tariffType.tariffKey:
+            learned = cached[0]
+
+        # Only hours after those the profile learned from can verify it.
+        learned_until = learned.get("learnedUntil")
+        engine = TariffEngine(
+            self.tariffType,
+            tariff_price.priceInfo,
+            learned.get("profile"),
+            learned.get("verified", False),
+        )
+        engine.learn(tariff_price.hours, since=learned_until)
+
+        if self.hour_ends:
+            learned_until = max(learned_until or 0, self.hour_ends[-1])
+        self.cache.set(
+            CACHE_TARIFF_PROFILE,
+            {
+                "tariffKey": self.tariffType.tariffKey,
+                "profile": engine.profile,
+                "learnedUntil": learned_until,
+                "verified": engine.verified,
+            },
+            dt_util.utcnow() + TARIFF_PROFILE_TTL,
+        )
+        return engine
+
+    def hour_price(self, index: int) -> dict[str, Any]:
+        """Return the mapped tariff period at index."""
+
+        start = self.hour_starts[index]
+        end = self.hour_ends[index]
+        start_time = dt_util.as_local(dt_util.utc_from_timestamp(start))
+        end_time = dt_util.as_local(dt_util.utc_from_timestamp(end))
+        fixed_price_id = self.fixed_price_ids[index]
+        return {
+            "start": start,
+            "end": end,
+            "startTime": start_time.isoformat(),
+            "endTime": end_time.isoformat(),
+            "energy_price": self.energy_prices[index],
+            "fixed_price_id": fixed_price_id,
+            **self.fixed_price(fixed_price_id),
+        }
+
+    def period_prices(self, start: float, end: float) -> list[tuple[float, float]]:
+        """Return (start epoch, energy price) of the mapped periods in [start, end)."""
+
+        if not self.hour_starts:
+            return []
+        first = bisect_left(self.hour_starts, start)
+        last = bisect_left(self.hour_starts, end)
+        return list(zip(self.hour_starts[first:last], self.energy_prices[first:last]))
+
+    def engine_hour_price(self, when: datetime) -> dict[str, Any] or None:
+        """Return the tariff period covering when, computed by the tariff engine.
+
+        Only used once the engine has priced every hour from Elvia correctly.
+        """
+
+        if self.engine is None or not self.engine.verified:
+            return None
+
+        period = self.resolution.total_seconds()
+        start = when.timestamp() // period * period
+        start_time = dt_util.utc_from_timestamp(start)
+        energy_price = self.engine.energy_price_at(start_time)
+        if energy_price is None:
+            return None
+
+        fixed_price_id = self.engine.fixed_price_id_at(start_time)
+        end_time = start_time + self.resolution
+        return {
+            "start": start,
+            "end": start + period,
+            "startTime": dt_util.as_local(start_time).isoformat(),
+            "endTime": dt_util.as_local(end_time).isoformat(),
+            "energy_price": energy_price.total,
+            "fixed_price_id": fixed_price_id,
+            **(
+                NO_FIXED_PRICE
+                if fixed_price_id is None
+                else self.fixed_price(fixed_price_id)
+            ),
+        }
+
+    def fixed_price(
+        self, fixed_price_id: str, level_id: str or None = None
+    ) -> dict[str, Any]:
+        """Return the fixed price of a tariff period, for the current level by default."""
+
+        return (self.fixed_price_index or {}).get(
+            (fixed_price_id, level_id or self.fixed_price_level_id),
+            NO_FIXED_PRICE,
+        )
+
+    def tariff_series(self, days: int = 1) -> dict[str, Any]:
+        """Return the energy price of every period in columnar form.
+
+        Periods after the payload are computed by the tariff engine, and are
+        None when it cannot price them.
+        """
+
+        if not self.hour_starts:
+            return {"start": None, "resolution": None, "totals": []}
+
+        start = self.hour_starts[0]
+        period = self.resolution.total_seconds()
+        end = dt_util.as_local(dt_util.utc_from_timestamp(start)) + timedelta(days=days)
+        count = int((end.timestamp() - start) // period)
+
+        totals = []
+        for index in range(count):
+            timestamp = start + index * period
+            position = self.period_index(timestamp)
+            if position is not None:
+                totals.append(self.energy_prices[position])
+                continue
+            hour_price = self.engine_hour_price(dt_util.utc_from_timestamp(timestamp))
+            totals.append(None if hour_price is None else hour_price["energy_price"])
+
+        return {
+            "start": int(start),
+            "resolution": int(period),
+            "totals": totals,
+        }
+
+    def period_index(self, timestamp: float) -> int or None:
+        """Return the index of the mapped tariff period covering an epoch, or None."""
+
+        index = bisect_right(self.hour_starts, timestamp) - 1
+        if index < 0 or timestamp >= self.hour_ends[index]:
+            return None
+        return index
+
+    def hour_price_at(self, when: datetime) -> dict[str, Any] or None:
+        """Return the tariff period covering when, or None.
+
+        Periods outside the payload are left to the tariff engine.
+        """
+
+        if not self.hour_starts:
+            return None
+
+        index = self.period_index(when.timestamp())
+        if index is None:
+            return self.engine_hour_price(when)
+        return self.hour_price(index)
+
+    def update_current_values(self) -> bool:
+        """Set the current values from the mapped tariff periods.
+
+        Returns False if no mapped period covers the current time.
+        """
+
+        hour_price = self.hour_price_at(dt_util.utcnow())
+        if hour_price is None:
+            return False
+
+        self.energy_price = hour_price["energy_price"]
+        if hour_price["fixed_price_hourly"] is not None:
+            self.fixed_price_hourly = hour_price["fixed_price_hourly"]
+            self.fixed_price_level_info = hour_price["fixed_price_level_info"]
+            self.fixed_price_level = hour_price["fixed_price_level"]
+        return True
+
+
+class ElviaMaxHoursCoordinator(ElviaCoordinator):
+    """Class to manage fetching maxhours from Elvia data API."""
+
+    maxhours: Any or None = None
+    mapped_maxhours: Any or None = None
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: ElviaApiClient,
+        cache: ElviaCache,
+        device_info: DeviceInfo,
+    ) -> None:
+        """Initialize."""
+
+        self.api = api
+        self.cache = cache
+        self._attr_device_info = device_info
+
+        super().__init__(
+            hass,
+            LOGGER,
+            name=f"{DOMAIN}_maxhours",
+            update_interval=MAXHOURS_UPDATE_INTERVAL,
+        )
+
+    async def _async_fetch_data(self) -> Any:
+        """Update data via library."""
+
+        if self.auth_failed:
+            # Do not call Elvia with a rejected token, wait for the reauth flow.
+            raise ConfigEntryAuthFailed("Token was rejected")
+
+        try:
+            maxhours = await self.api.maxhours()
+            await self.map_maxhour_values(maxhours)
+        except ApiClientAuthenticationException as error:
+            self.auth_failed = True
+            raise ConfigEntryAuthFailed(error) from error
+        except Exception as error:  # pylint: disable=broad-except
+            if self.mapped_maxhours is None:
+                LOGGER.error("Update error %s", error)
+                raise UpdateFailed(error) from error
+            # Keep the last good maxhours until the next update.
+            LOGGER.warning("Failed to update maxhours, keeping last values: %s", error)
+            return self.maxhours
+
+        self.maxhours = maxhours
+        self.cache.set(
+            CACHE_MAXHOURS, maxhours, dt_util.utcnow() + MAXHOURS_UPDATE_INTERVAL
+        )
+        return self.maxhours
+
+    async def async_load_cache(self) -> bool:
+        """Use the cached maxhours, returns False if they should be refreshed."""
+
+        cached = self.cache.get(CACHE_MAXHOURS)
+        if cached is None:
+            return False
+
+        try:
+            await self.map_maxhour_values(cached[0])
+        except (KeyError, IndexError, TypeError) as error:
+            LOGGER.debug("Ignoring cached maxhours: %s", error)
+            return False
+
+        self.maxhours = cached[0]
+        self.async_set_updated_data(self.maxhours)
+        return cached[1]
+
+    def fields(self) -> dict[str, Any]:
+        """Return the mapped maxhours flattened to month_key fields."""
+
+        fields = super().fields()
+        for month, values in (self.mapped_maxhours or {}).items():
+            for key, value in values.items():
+                fields[f"{month}_{key}"] = value
+        return fields
+
     def getMonth(self, object, index):
         try:
             return {
@@ -107,11 +708,12 @@ class ElviaDataUpdateCoordinator(DataUpdateCoordinator):
 
     async def map_maxhour_values(self, data) -> None:
 
-        self.mapped_maxhours = {}
+        start = perf_counter()
+        mapped_maxhours = {}
 
         for aggregateMonth in data['meteringpoints'][0]['maxHoursAggregate']:
             month = "current_month" if aggregateMonth['noOfMonthsBack'] == 0 else "previous_month"
-            self.mapped_maxhours[month] = {
+            mapped_maxhours[month] = {
                 "1": self.getMonth(aggregateMonth, 2),
                 "2": self.getMonth(aggregateMonth, 1),
                 "3": self.getMonth(aggregateMonth, 0),
@@ -119,77 +721,5 @@ class ElviaDataUpdateCoordinator(DataUpdateCoordinator):
                 "uom": aggregateMonth['uom']
             }
 
-    async def map_meteringpoint_values(self, data) -> None:
-        """Map values."""
-
-        current_datetime = datetime.now()
-
-        zoneadjust = "+02:00" if localtime().tm_isdst > 0 else "+01:00"
-
-        pretty_now = (
-            str(current_datetime.year)
-            + "-"
-            + str(current_datetime.month).zfill(2)
-            + "-"
-            + str(current_datetime.day).zfill(2)
-            + "T"
-            + str(current_datetime.hour).zfill(2)
-            + ":"
-            + str(current_datetime.minute).zfill(2)
-            + ":"
-            + str(current_datetime.second).zfill(2)
-            + zoneadjust
-        )
-
-        today_string = (
-            str(current_datetime.year)
-            + "-"
-            + str(current_datetime.month).zfill(2)
-            + "-"
-            + str(current_datetime.day).zfill(2)
-        )
-
-        self.tariffType = data.gridTariff.tariffType
-
-        tariff_price = data.gridTariff.tariffPrice
-
-        first_metering_point = next(data.meteringPointsAndPriceLevels)
-        fixed_price_level_id = first_metering_point.currentFixedPriceLevel.levelId
-
-        self.tariff_prices = []
-
-        for hour in tariff_price.hours:
-            start_time = hour.startTime
-            end_time = hour.expiredAt
-            value = hour.energyPrice.total
-
-            self.tariff_prices.append({
-                "startTime": start_time,
-                "endTime": end_time,
-                "total": value,
-            })
-
-            if start_time[0:10] == today_string:
-                if (pretty_now >= start_time) and (pretty_now < end_time):
-                    variable_price_per_hour = value
-                    for_loop_break = False
-
-                    for fixed_price_element in tariff_price.priceInfo.fixedPrices:
-                        if hour.fixedPrice.id == fixed_price_element.id:
-                            for price_levels_element in fixed_price_element.priceLevels:
-
-                                if price_levels_element.id == fixed_price_level_id:
-                                    hour_prices = next(price_levels_element.hourPrices)
-                                    fixed_price_per_hour = hour_prices.total
-                                    fixed_price_level_info = (
-                                        price_levels_element.levelInfo
-                                    )
-                                    fixed_price = price_levels_element.monthlyTotal
-                                    for_loop_break = True
-                                    break
-                            if for_loop_break is True:
-                                self.energy_price = variable_price_per_hour
-                                self.fixed_price_hourly = fixed_price_per_hour
-                                self.fixed_price_level_info = fixed_price_level_info
-                                self.fixed_price_level = fixed_price
-                                break
+        self.mapped_maxhours = mapped_maxhours
+        self.mapping_time = perf_counter() - start
@@ -2,29 +2,126 @@
 
 from __future__ import annotations
 
-import json
 from typing import Any
 
+import attr
+
+from homeassistant.components.diagnostics import async_redact_data
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_API_KEY
 from homeassistant.core import HomeAssistant
 
-from custom_components.elvia.const import DOMAIN
-from custom_components.elvia.coordinator import ElviaDataUpdateCoordinator
-from custom_components.elvia.models import GridTariffCollection
+from custom_components.elvia.api import endpoint_stats
+from custom_components.elvia.const import (
+    CONF_METERING_POINT_ID,
+    CONF_TOKEN,
+    DATA_BACKFILL,
+    DATA_BATCHERS,
+    DATA_CACHE,
+    DATA_MAXHOURS,
+    DATA_STATISTICS,
+    DATA_TARIFF,
+    DOMAIN,
+)
+from custom_components.elvia.coordinator import (
+    ElviaCoordinator,
+    ElviaDataUpdateCoordinator,
+    ElviaMaxHoursCoordinator,
+)
+
+# The statistic id is built from the metering point id
+TO_REDACT = {
+    CONF_API_KEY,
+    CONF_TOKEN,
+    CONF_METERING_POINT_ID,
+    "meteringPointId",
+    "statistic_id",
+}
+
+
+def _coordinator_state(coordinator: ElviaCoordinator) -> dict[str, Any]:
+    """Return the state of a coordinator, without its payload."""
+    return {
+        "last_update_success": coordinator.last_update_success,
+        "last_exception": repr(coordinator.last_exception)
+        if coordinator.last_exception
+        else None,
+        "update_interval": str(coordinator.update_interval),
+        "auth_failed": coordinator.auth_failed,
+        "timings": coordinator.performance(),
+        "entity_updates": dict(coordinator.entity_updates),
+    }
 
 
 async def async_get_config_entry_diagnostics(
     hass: HomeAssistant, config_entry: ConfigEntry
 ) -> dict:
-    """Return diagnostics for a config entry."""
+    """Return diagnostics for a config entry.
 
-    diagnostics: dict[str, Any] = {}
+    Everything is read from memory, nothing is fetched from Elvia.
+    """
 
-    coordinator: ElviaDataUpdateCoordinator = hass.data[DOMAIN][config_entry.entry_id]
-    data: GridTariffCollection = coordinator.data
+    data = hass.data[DOMAIN][config_entry.entry_id]
+    coordinator: ElviaDataUpdateCoordinator = data[DATA_TARIFF]
+    maxhours_coordinator: ElviaMaxHoursCoordinator = data[DATA_MAXHOURS]
+    batcher = hass.data[DOMAIN][DATA_BATCHERS].get(config_entry.data[CONF_API_KEY])
 
-    diagnostics["tariffPrice"] = json.dumps(data.gridTariff.tariffPrice, default=str)
-    diagnostics["tariffType"] = json.dumps(data.gridTariff.tariffType, default=str)
-    diagnostics["meteringPointsAndPriceLevels"] = json.dumps(data.meteringPointsAndPriceLevels, default=str)
+    diagnostics: dict[str, Any] = {
+        "entry": {
+            "data": config_entry.data,
+            "options": config_entry.options,
+        },
+        "tariff": {
+            **_coordinator_state(coordinator),
+            "scheduler": {
+                "resolution": str(coordinator.resolution),
+                "refresh_offset": str(coordinator.refresh_offset),
+                "refresh_slot": str(coordinator.scheduler.slot(coordinator.entry_id)),
+                "refresh_window": coordinator.scheduler.window,
+                "next_refresh": coordinator.next_refresh,
+                "fetched_date": coordinator.fetched_date,
+                "covered_date": coordinator.covered_date,
+            },
+            "current": {
+                "energy_price": coordinator.energy_price,
+                "fixed_price_hourly": coordinator.fixed_price_hourly,
+                "fixed_price_level_info": coordinator.fixed_price_level_info,
+                "fixed_price_level": coordinator.fixed_price_level,
+            },
+            "engine": {
+                "verified": coordinator.engine.verified,
+                "checked": coordinator.engine.checked,
+                "mismatches": coordinator.engine.mismatches,
+                "profile_size": len(coordinator.engine.profile),
+            }
+            if coordinator.engine is not None
+            else None,
+            "meteringpoint": attr.asdict(coordinator.meteringpoint)
+            if coordinator.meteringpoint is not None
+            else None,
+        },
+        "maxhours": {
+            **_coordinator_state(maxhours_coordinator),
+            "mapped": maxhours_coordinator.mapped_maxhours,
+        },
+        "cache": {
+            "stored": data[DATA_CACHE].state(),
+            "http": coordinator.api.cache_stats,
+            "batched_meteringpoints": len(batcher.metering_point_ids)
+            if batcher is not None
+            else None,
+        },
+        "history": {
+            "loaded": data[DATA_BACKFILL].history.loaded,
+            "stored_hours": data[DATA_BACKFILL].history.count,
+            "completed_days": len(data[DATA_BACKFILL].history.completed),
+        },
+        "statistics": {
+            "statistic_id": data[DATA_STATISTICS].statistic_id,
+            "last_imported": data[DATA_STATISTICS].last_imported,
+            "imported_hours": data[DATA_STATISTICS].imported,
+        },
+        "endpoints": endpoint_stats(),
+    }
 
-    return diagnostics
\ No newline at end of file
+    return async_redact_data(diagnostics, TO_REDACT)
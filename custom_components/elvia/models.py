@@ -1,12 +1,16 @@
 """Asynchronous Python client for Elvia."""
 
-from typing import Any, List, Dict
+from typing import Any, Dict, Tuple
+
+import logging
+from datetime import datetime
+from time import perf_counter
 
 import attr
 
 from .const import LOGGER
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True, frozen=True)
 class FixedPriceConfiguration:
 
     basis: str
@@ -35,7 +39,7 @@ class FixedPriceConfiguration:
             months=float(data["months"]),
         )
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True, frozen=True)
 class TariffType:
 
     tariffKey: str
@@ -77,7 +81,7 @@ class TariffType:
             description=data["description"],
         )
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True, frozen=True)
 class HourPrice:
 
     id: str
@@ -101,7 +105,7 @@ class HourPrice:
             totalExVat=float(data["totalExVat"]),
         )
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True, frozen=True)
 class PriceLevel:
 
     id: str
@@ -115,7 +119,7 @@ class PriceLevel:
     monthlyExTaxes: float
     monthlyTaxes: float
     monthlyUnitOfMeasure: str
-    hourPrices: List[HourPrice]
+    hourPrices: Tuple[HourPrice, ...]
     levelInfo: str
     currency: str
     monetaryUnitOfMeasure: str
@@ -141,19 +145,19 @@ class PriceLevel:
             monthlyExTaxes=float(data["monthlyExTaxes"]),
             monthlyTaxes=float(data["monthlyTaxes"]),
             monthlyUnitOfMeasure=data["monthlyUnitOfMeasure"],
-            hourPrices=(HourPrice.from_dict(price) for price in data["hourPrices"]),
+            hourPrices=tuple(HourPrice.from_dict(price) for price in data["hourPrices"]),
             levelInfo=data["levelInfo"],
             currency=data["currency"],
             monetaryUnitOfMeasure=data["monetaryUnitOfMeasure"],
         )
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True, frozen=True)
 class FixedPrice:
 
     id: str
     startDate: str
     endDate: str
-    priceLevels: List[PriceLevel]
+    priceLevels: Tuple[PriceLevel, ...]
 
     def to_json(self):
         return "TariffType"
@@ -168,10 +172,10 @@ class FixedPrice:
             id=data["id"],
             startDate=data["startDate"],
             endDate=data["endDate"],
-            priceLevels=(PriceLevel.from_dict(price) for price in data["priceLevels"]),
+            priceLevels=tuple(PriceLevel.from_dict(price) for price in data["priceLevels"]),
         )
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True, frozen=True)
 class EnergyPrice:
 
     id: str
@@ -209,7 +213,7 @@ class EnergyPrice:
             monetaryUnitOfMeasure=data["monetaryUnitOfMeasure"],
         )
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True, frozen=True)
 class FixedPriceHour:
 
     id: str
@@ -229,7 +233,7 @@ class FixedPriceHour:
             hourId=data["hourId"],
         )
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True, frozen=True)
 class EnergyPriceHour:
 
     id: str
@@ -251,12 +255,12 @@ class EnergyPriceHour:
             totalExVat=float(data["totalExVat"]),
         )
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True, frozen=True)
 class PriceInfo:
 
     #powerPrices: None
-    fixedPrices: List[FixedPrice]
-    energyPrices: List[EnergyPrice]
+    fixedPrices: Tuple[FixedPrice, ...]
+    energyPrices: Tuple[EnergyPrice, ...]
 
     def to_json(self):
         return "TariffType"
@@ -268,11 +272,11 @@ class PriceInfo:
         LOGGER.debug("PriceInfo=%s", data)
 
         return PriceInfo(
-            fixedPrices=(FixedPrice.from_dict(price) for price in data["fixedPrices"]),
-            energyPrices=(EnergyPrice.from_dict(price) for price in data["energyPrices"]),
+            fixedPrices=tuple(FixedPrice.from_dict(price) for price in data["fixedPrices"]),
+            energyPrices=tuple(EnergyPrice.from_dict(price) for price in data["energyPrices"]),
         )
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True, frozen=True)
 class Hour:
 
     startTime: str
@@ -302,10 +306,10 @@ class Hour:
             energyPrice=EnergyPriceHour.from_dict(data["energyPrice"]),
         )
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True, frozen=True)
 class TariffPrice:
 
-    hours: List[Hour]
+    hours: Tuple[Hour, ...]
     priceInfo: PriceInfo
 
     def to_json(self):
@@ -318,11 +322,11 @@ class TariffPrice:
         LOGGER.debug("TariffPrice=%s", data)
 
         return TariffPrice(
-            hours=(Hour.from_dict(hour) for hour in data["hours"]),
+            hours=tuple(Hour.from_dict(hour) for hour in data["hours"]),
             priceInfo=PriceInfo.from_dict(data["priceInfo"]),
         )
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True, frozen=True)
 class GridTariff:
 
     tariffType: TariffType
@@ -342,7 +346,7 @@ class GridTariff:
             tariffPrice=(TariffPrice.from_dict(data["tariffPrice"])),
         )
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True, frozen=True)
 class CurrentFixedPriceLevel:
 
     id: str
@@ -362,7 +366,7 @@ class CurrentFixedPriceLevel:
             levelId=data["levelId"],
         )
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True, frozen=True)
 class MeteringPoints:
 
     meteringPointId: str
@@ -384,11 +388,11 @@ class MeteringPoints:
             lastUpdated=data["lastUpdated"],
         )
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True, frozen=True)
 class MeteringPointsAndPriceLevels:
 
     currentFixedPriceLevel: CurrentFixedPriceLevel
-    meteringPoints: List[MeteringPoints]
+    meteringPoints: Tuple[MeteringPoints, ...]
 
     def to_json(self):
         return "TariffType"
@@ -401,14 +405,14 @@ class MeteringPointsAndPriceLevels:
 
         return MeteringPointsAndPriceLevels(
             currentFixedPriceLevel=CurrentFixedPriceLevel.from_dict(data["currentFixedPriceLevel"]),
-            meteringPoints=(MeteringPoints.from_dict(meteringpoint) for meteringpoint in data["meteringPoints"]),
+            meteringPoints=tuple(MeteringPoints.from_dict(meteringpoint) for meteringpoint in data["meteringPoints"]),
         )
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True, frozen=True)
 class GridTariffCollection:
 
     gridTariff: GridTariff
-    meteringPointsAndPriceLevels: List[MeteringPointsAndPriceLevels]
+    meteringPointsAndPriceLevels: Tuple[MeteringPointsAndPriceLevels, ...]
 
     def to_json(self):
         return "TariffType"
@@ -421,8 +425,199 @@ class GridTariffCollection:
 
         return GridTariffCollection(
             gridTariff=(GridTariff.from_dict(data["gridTariff"])),
-            meteringPointsAndPriceLevels=(MeteringPointsAndPriceLevels.from_dict(meteringpointandpricelevel) for meteringpointandpricelevel in data["meteringPointsAndPriceLevels"]),
+            meteringPointsAndPriceLevels=tuple(MeteringPointsAndPriceLevels.from_dict(meteringpointandpricelevel) for meteringpointandpricelevel in data["meteringPointsAndPriceLevels"]),
+        )
+
+
+
+def _decode_price_level(data: Dict[str, Any]) -> PriceLevel:
+    return PriceLevel(
+        data["id"],
+        data["valueMin"],
+        data["valueMax"],
+        data["nextIdDown"],
+        data["nextIdUp"],
+        data["valueUnitOfMeasure"],
+        float(data["monthlyTotal"]),
+        float(data["monthlyTotalExVat"]),
+        float(data["monthlyExTaxes"]),
+        float(data["monthlyTaxes"]),
+        data["monthlyUnitOfMeasure"],
+        tuple(
+            [
+                HourPrice(
+                    price["id"],
+                    float(price["numberOfDaysInMonth"]),
+                    float(price["total"]),
+                    float(price["totalExVat"]),
+                )
+                for price in data["hourPrices"]
+            ]
+        ),
+        data["levelInfo"],
+        data["currency"],
+        data["monetaryUnitOfMeasure"],
+    )
+
+
+def _decode_hours(data: list) -> Tuple[Hour, ...]:
+    # Hours share a handful of fixed price references, keep one object of each.
+    fixed_price_hours: Dict[Tuple[str, str], FixedPriceHour] = {}
+
+    hours = []
+    append = hours.append
+    for hour in data:
+        fixed_price = hour["fixedPrice"]
+        key = (fixed_price["id"], fixed_price["hourId"])
+        fixed_price_hour = fixed_price_hours.get(key)
+        if fixed_price_hour is None:
+            fixed_price_hour = fixed_price_hours[key] = FixedPriceHour(*key)
+
+        energy_price = hour["energyPrice"]
+        append(
+            Hour(
+                hour["startTime"],
+                hour["expiredAt"],
+                hour["shortName"],
+                bool(hour["isPublicHoliday"]),
+                fixed_price_hour,
+                hour["powerPrice"],
+                EnergyPriceHour(
+                    energy_price["id"],
+                    float(energy_price["total"]),
+                    float(energy_price["totalExVat"]),
+                ),
+            )
+        )
+    return tuple(hours)
+
+
+def decode_tariff_types(data: Dict[str, Any]) -> Tuple[TariffType, ...]:
+    """Decode the tariff types of a tarifftype response."""
+    return tuple(TariffType.from_dict(tariff_type) for tariff_type in data["tariffKey"])
+
+
+def decode_tariff_query_prices(data: Dict[str, Any]) -> Tuple[Tuple[float, float], ...]:
+    """Decode only the start epoch and energy price of every hour of a tariffquery.
+
+    Used by backfills, which keep nothing else of the response.
+    """
+
+    return tuple(
+        [
+            (
+                datetime.fromisoformat(hour["startTime"]).timestamp(),
+                float(hour["energyPrice"]["total"]),
+            )
+            for hour in data["gridTariff"]["tariffPrice"]["hours"]
+        ]
+    )
+
+
+def _decode_grid_tariff(data: Dict[str, Any]) -> GridTariff:
+    tariff_price = data["tariffPrice"]
+    price_info = tariff_price["priceInfo"]
+
+    return GridTariff(
+        TariffType.from_dict(data["tariffType"]),
+        TariffPrice(
+            _decode_hours(tariff_price["hours"]),
+            PriceInfo(
+                tuple(
+                    [
+                        FixedPrice(
+                            price["id"],
+                            price["startDate"],
+                            price["endDate"],
+                            tuple(
+                                [
+                                    _decode_price_level(level)
+                                    for level in price["priceLevels"]
+                                ]
+                            ),
+                        )
+                        for price in price_info["fixedPrices"]
+                    ]
+                ),
+                tuple(
+                    [
+                        EnergyPrice(
+                            price["id"],
+                            price["startDate"],
+                            price["endDate"],
+                            price["season"],
+                            price["level"],
+                            float(price["total"]),
+                            float(price["totalExVat"]),
+                            float(price["energyExTaxes"]),
+                            float(price["taxes"]),
+                            price["currency"],
+                            price["monetaryUnitOfMeasure"],
+                        )
+                        for price in price_info["energyPrices"]
+                    ]
+                ),
+            ),
+        ),
+    )
+
+
+def decode_grid_tariff(data: Dict[str, Any]) -> GridTariff:
+    """Decode the GridTariff of a tariffquery response in one pass."""
+
+    start = perf_counter()
+    grid_tariff = _decode_grid_tariff(data["gridTariff"])
+
+    if LOGGER.isEnabledFor(logging.DEBUG):
+        LOGGER.debug(
+            "Decoded %s hours in %.2f ms",
+            len(grid_tariff.tariffPrice.hours),
+            (perf_counter() - start) * 1000,
+        )
+    return grid_tariff
+
+
+def decode_grid_tariff_collection(data: Dict[str, Any]) -> GridTariffCollection:
+    """Decode a GridTariffCollection in one pass over the fixed schema.
+
+    Unlike the from_dict chain this does not log every sub-dict, and it logs
+    the decode time when debug logging is enabled.
+    """
+
+    start = perf_counter()
+
+    collection = GridTariffCollection(
+        _decode_grid_tariff(data["gridTariff"]),
+        tuple(
+            [
+                MeteringPointsAndPriceLevels(
+                    CurrentFixedPriceLevel(
+                        level["currentFixedPriceLevel"]["id"],
+                        level["currentFixedPriceLevel"]["levelId"],
+                    ),
+                    tuple(
+                        [
+                            MeteringPoints(
+                                meteringpoint["meteringPointId"],
+                                meteringpoint["levelValue"],
+                                meteringpoint["lastUpdated"],
+                            )
+                            for meteringpoint in level["meteringPoints"]
+                        ]
+                    ),
+                )
+                for level in data["meteringPointsAndPriceLevels"]
+            ]
+        ),
+    )
+
+    if LOGGER.isEnabledFor(logging.DEBUG):
+        LOGGER.debug(
+            "Decoded %s hours in %.2f ms",
+            len(collection.gridTariff.tariffPrice.hours),
+            (perf_counter() - start) * 1000,
         )
+    return collection
 
 
 #@attr.s(auto_attribs=True)
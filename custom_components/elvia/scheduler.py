@@ -0,0 +1,66 @@
+"""Refresh scheduling shared by all Elvia entries."""
+
+from __future__ import annotations
+
+from typing import Dict
+
+import asyncio
+from datetime import timedelta
+
+from .const import DEFAULT_REFRESH_WINDOW, REQUEST_CONCURRENCY
+
+
+class ElviaRefreshScheduler:
+    """Spread the refreshes of all entries over a window after each boundary.
+
+    Entries sharing an api key get the same slot, so their tariff requests are
+    batched into one, and every api key gets its own slot in the window.
+    Requests are limited to REQUEST_CONCURRENCY at a time per api key.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+
+        self._api_keys: Dict[str, str] = {}
+        self._windows: Dict[str, float] = {}
+        self._request_limits: Dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def window(self) -> float:
+        """Return the window in seconds, the largest one asked for by an entry."""
+        return max(self._windows.values(), default=DEFAULT_REFRESH_WINDOW)
+
+    def register(self, entry_id: str, api_key: str, window: float) -> None:
+        """Give an entry a slot in the window."""
+        self._api_keys[entry_id] = api_key
+        self._windows[entry_id] = window
+
+    def unregister(self, entry_id: str) -> None:
+        """Free the slot of an entry."""
+
+        api_key = self._api_keys.pop(entry_id, None)
+        self._windows.pop(entry_id, None)
+        if api_key is not None and api_key not in self._api_keys.values():
+            self._request_limits.pop(api_key, None)
+
+    @property
+    def entry_ids(self) -> list[str]:
+        """Return the registered entries."""
+        return list(self._api_keys)
+
+    def slot(self, entry_id: str) -> timedelta:
+        """Return how long after a boundary the entry should refresh."""
+
+        api_keys = sorted(set(self._api_keys.values()))
+        api_key = self._api_keys.get(entry_id)
+        if api_key is None:
+            return timedelta()
+        return timedelta(
+            seconds=self.window * api_keys.index(api_key) / len(api_keys)
+        )
+
+    def request_limit(self, api_key: str) -> asyncio.Semaphore:
+        """Return the semaphore limiting concurrent requests for an api key."""
+        return self._request_limits.setdefault(
+            api_key, asyncio.Semaphore(REQUEST_CONCURRENCY)
+        )
@@ -6,17 +6,18 @@ from datetime import datetime
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.components.sensor import (
-    SensorEntity,
+    RestoreSensor,
     SensorEntityDescription,
     SensorStateClass,
 )
+from homeassistant.const import EntityCategory, UnitOfTime
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import StateType
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, LOGGER
-from .coordinator import ElviaDataUpdateCoordinator
+from .const import DATA_MAXHOURS, DATA_TARIFF, DOMAIN, LOGGER
+from .coordinator import ElviaDataUpdateCoordinator, ElviaMaxHoursCoordinator
 
 FIXED_PRICE_SENSORS: tuple[SensorEntityDescription, ...] = (
     SensorEntityDescription(
@@ -38,6 +39,33 @@ FIXED_PRICE_SENSORS: tuple[SensorEntityDescription, ...] = (
     ),
 )
 
+PERFORMANCE_SENSORS: tuple[SensorEntityDescription, ...] = (
+    SensorEntityDescription(
+        key="refresh_time",
+        name="Tariff refresh time",
+        icon="mdi:timer-outline",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    SensorEntityDescription(
+        key="decode_time",
+        name="Tariff decode time",
+        icon="mdi:timer-outline",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    SensorEntityDescription(
+        key="mapping_time",
+        name="Tariff mapping time",
+        icon="mdi:timer-outline",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+)
+
 ENERGY_PRICE_SENSORS: tuple[SensorEntityDescription, ...] = (
     SensorEntityDescription(
         key="energy_price",
@@ -56,7 +84,10 @@ async def async_setup_entry(
 ) -> None:
     """Add sensor entities from a config_entry."""
 
-    coordinator: ElviaDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    coordinator: ElviaDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id][DATA_TARIFF]
+    maxhours_coordinator: ElviaMaxHoursCoordinator = hass.data[DOMAIN][entry.entry_id][
+        DATA_MAXHOURS
+    ]
 
     async_add_entities(
         ElviaCoordinatorSensor(coordinator, description, "elvia")
@@ -68,28 +99,40 @@ async def async_setup_entry(
         for description in ENERGY_PRICE_SENSORS
     )
 
+    async_add_entities(
+        ElviaPerformanceSensor(coordinator, description, "elvia")
+        for description in PERFORMANCE_SENSORS
+    )
+
     async_add_entities([
-        ElviaMaxHourAverageSensor(coordinator, True),
-        ElviaMaxHourAverageSensor(coordinator, False),
-        ElviaMaxHourSensor(coordinator, True, 1),
-        ElviaMaxHourSensor(coordinator, True, 2),
-        ElviaMaxHourSensor(coordinator, True, 3),
-        ElviaMaxHourSensor(coordinator, False, 1),
-        ElviaMaxHourSensor(coordinator, False, 2),
-        ElviaMaxHourSensor(coordinator, False, 3),
+        ElviaMaxHourAverageSensor(maxhours_coordinator, True),
+        ElviaMaxHourAverageSensor(maxhours_coordinator, False),
+        ElviaMaxHourSensor(maxhours_coordinator, True, 1),
+        ElviaMaxHourSensor(maxhours_coordinator, True, 2),
+        ElviaMaxHourSensor(maxhours_coordinator, True, 3),
+        ElviaMaxHourSensor(maxhours_coordinator, False, 1),
+        ElviaMaxHourSensor(maxhours_coordinator, False, 2),
+        ElviaMaxHourSensor(maxhours_coordinator, False, 3),
     ])
 
 
-class ElviaSensor(CoordinatorEntity, SensorEntity):
-    """Define a Elvia entity."""
+class ElviaSensor(CoordinatorEntity, RestoreSensor):
+    """Define a Elvia entity.
+
+    Until the coordinator has a value, the last known value is restored and
+    the state is marked stale.
+    """
 
-    coordinator: ElviaDataUpdateCoordinator
+    coordinator: ElviaDataUpdateCoordinator | ElviaMaxHoursCoordinator
     sensor_data: Any
     attribute: str
+    _written_state: tuple | None = None
+    _restored: bool = False
+    _restored_unit: str | None = None
 
     def __init__(
         self,
-        coordinator: ElviaDataUpdateCoordinator,
+        coordinator: ElviaDataUpdateCoordinator | ElviaMaxHoursCoordinator,
         description: SensorEntityDescription,
         key_prefix: str,
     ) -> None:
@@ -102,17 +145,86 @@ class ElviaSensor(CoordinatorEntity, SensorEntity):
         self._attr_device_info = coordinator._attr_device_info
         self.update_from_data()
 
+    async def async_added_to_hass(self) -> None:
+        """Restore the last known value if the coordinator has none yet."""
+        await super().async_added_to_hass()
+
+        if self.sensor_data is not None:
+            return
+        last_sensor_data = await self.async_get_last_sensor_data()
+        if last_sensor_data is None or last_sensor_data.native_value is None:
+            return
+
+        self.sensor_data = last_sensor_data.native_value
+        self._restored_unit = last_sensor_data.native_unit_of_measurement
+        self._restored = True
+
+    @property
+    def available(self) -> bool:
+        """Keep showing a restored value while Elvia cannot be reached."""
+        return super().available or self._restored
+
+    @property
+    def stale(self) -> bool:
+        """Return True if the value is not from a successful refresh."""
+        return self._restored or not self.coordinator.last_update_success
+
     @property
     def native_value(self) -> StateType:
         """Return the state."""
         return cast(StateType, self.sensor_data)
 
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the attributes, marking stale values."""
+        attributes = self.attributes_from_data()
+        if self.stale:
+            attributes = {**(attributes or {}), "stale": True}
+        return attributes
+
+    def attributes_from_data(self) -> dict[str, Any] | None:
+        return None
+
+    @property
+    def fields(self) -> set[str]:
+        """Return the coordinator fields this entity is derived from."""
+        return {self.attribute}
+
     def update_from_data(self) -> None:
         self.sensor_data = "unknown"
 
+    def _state_snapshot(self) -> tuple:
+        """Return everything the written state is made of."""
+        return (
+            self.available,
+            self.native_value,
+            self.native_unit_of_measurement,
+            self.extra_state_attributes,
+        )
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state, remembering what was written."""
+        self._written_state = self._state_snapshot()
+        super().async_write_ha_state()
+
     @callback
     def _handle_coordinator_update(self) -> None:
-        self.update_from_data()
+        """Only write the state when one of our fields or the availability changed."""
+
+        if self.fields & self.coordinator.changed_fields:
+            restored = self.sensor_data
+            self.update_from_data()
+            if self.sensor_data is not None:
+                self._restored = False
+            elif self._restored:
+                self.sensor_data = restored
+        if self._state_snapshot() == self._written_state:
+            return
+
+        self.coordinator.entity_updates[self.entity_id] = (
+            self.coordinator.entity_updates.get(self.entity_id, 0) + 1
+        )
         super()._handle_coordinator_update()
 
 
@@ -123,23 +235,30 @@ class ElviaCoordinatorSensor(ElviaSensor):
         self.sensor_data = self.coordinator.__getattribute__(self.attribute)
 
 class ElviaEnergySensor(ElviaSensor):
-    """Define a ElviaTariffTypeSensor entity."""
+    """Define a ElviaTariffTypeSensor entity.
+
+    The price series is served by the get_tariff_prices service, not as an
+    attribute, to keep it out of the recorder.
+    """
 
     def update_from_data(self) -> None:
         self.sensor_data = self.coordinator.__getattribute__(self.attribute)
 
-    @property
-    def extra_state_attributes(self):
-        return {
-            "daily_tariff": self.coordinator.tariff_prices
-        }
+class ElviaPerformanceSensor(ElviaSensor):
+    """Define a ElviaPerformanceSensor entity, timings in milliseconds."""
+
+    def update_from_data(self) -> None:
+        value = self.coordinator.__getattribute__(self.attribute)
+        self.sensor_data = None if value is None else round(value * 1000, 2)
 
 class ElviaMaxHourAverageSensor(ElviaSensor):
     """Define a ElviaMaxHourSensor entity."""
 
+    coordinator: ElviaMaxHoursCoordinator
+
     def __init__(
         self,
-        coordinator: ElviaDataUpdateCoordinator,
+        coordinator: ElviaMaxHoursCoordinator,
         current_month: bool,
     ) -> None:
         """Initialize."""
@@ -154,19 +273,36 @@ class ElviaMaxHourAverageSensor(ElviaSensor):
         )
         super().__init__(coordinator, description, "elvia")
 
+    @property
+    def available(self) -> bool:
+        return super().available and (
+            self.coordinator.mapped_maxhours is not None or self._restored
+        )
+
+    @property
+    def fields(self) -> set[str]:
+        return {f"{self.month}_average"}
+
     @property
     def native_unit_of_measurement(self) -> str | None:
+        if self.coordinator.mapped_maxhours is None:
+            return self._restored_unit
         return self.coordinator.mapped_maxhours[self.month]['uom']
 
     def update_from_data(self) -> None:
+        if self.coordinator.mapped_maxhours is None:
+            self.sensor_data = None
+            return
         self.sensor_data = self.coordinator.mapped_maxhours[self.month]['average']
 
 class ElviaMaxHourSensor(ElviaSensor):
     """Define a ElviaMaxHourSensor entity."""
 
+    coordinator: ElviaMaxHoursCoordinator
+
     def __init__(
         self,
-        coordinator: ElviaDataUpdateCoordinator,
+        coordinator: ElviaMaxHoursCoordinator,
         current_month: bool,
         sensor_index: int,
     ) -> None:
@@ -183,15 +319,31 @@ class ElviaMaxHourSensor(ElviaSensor):
         )
         super().__init__(coordinator, description, "elvia")
 
+    @property
+    def available(self) -> bool:
+        return super().available and (
+            self.coordinator.mapped_maxhours is not None or self._restored
+        )
+
+    @property
+    def fields(self) -> set[str]:
+        return {f"{self.month}_{self.sensor_index}"}
+
     def update_from_data(self) -> None:
+        if self.coordinator.mapped_maxhours is None:
+            self.sensor_data = None
+            return
         self.sensor_data = self.coordinator.mapped_maxhours[self.month][self.sensor_index]['value']
 
     @property
     def native_unit_of_measurement(self) -> str | None:
+        if self.coordinator.mapped_maxhours is None:
+            return self._restored_unit
         return self.coordinator.mapped_maxhours[self.month][self.sensor_index]['uom']
 
-    @property
-    def extra_state_attributes(self):
+    def attributes_from_data(self) -> dict[str, Any] | None:
+        if self.coordinator.mapped_maxhours is None:
+            return None
         return {
             "startTime": self.coordinator.mapped_maxhours[self.month][self.sensor_index]['startTime'],
             "endTime": self.coordinator.mapped_maxhours[self.month][self.sensor_index]['endTime']
@@ -0,0 +1,239 @@
+"""Array backed, memory-mapped time series of tariff prices."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import math
+import mmap
+import os
+import struct
+from array import array
+from datetime import date, timedelta
+
+from homeassistant.util import dt as dt_util
+
+# Magic, version, start epoch and resolution in seconds
+_HEADER = struct.Struct("<4sIqq")
+_MAGIC = b"ELVS"
+_VERSION = 1
+
+PERIOD_DAY = "day"
+PERIOD_MONTH = "month"
+
+
+class ElviaTariffSeries:
+    """Prices at a fixed resolution, as float64 in a memory-mapped file.
+
+    The start of period i is start + i * resolution, so only the prices are
+    stored. Periods without a price are NaN. The file is replaced atomically
+    on every write, and reads slice the mapped buffer without copying. All
+    methods do blocking I/O and belong in an executor.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Initialize."""
+
+        self.path = path
+        self.start: Optional[int] = None
+        self.resolution: Optional[int] = None
+        self._file = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._buffer: Optional[memoryview] = None
+        self._values: memoryview = memoryview(array("d"))
+
+    def __len__(self) -> int:
+        """Return the number of periods, with or without a price."""
+        return len(self._values)
+
+    @property
+    def end(self) -> Optional[int]:
+        """Return the end epoch of the last period."""
+        if self.start is None:
+            return None
+        return self.start + len(self._values) * self.resolution
+
+    def open(self) -> None:
+        """Map the file, if there is one."""
+
+        self.close()
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < _HEADER.size:
+            return
+
+        self._file = open(self.path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, start, resolution = _HEADER.unpack_from(self._mmap)
+        if magic != _MAGIC or version != _VERSION:
+            self.close()
+            return
+
+        self.start = start
+        self.resolution = resolution
+        self._buffer = memoryview(self._mmap)
+        self._values = self._buffer[_HEADER.size :].cast("d")
+
+    def close(self) -> None:
+        """Unmap the file."""
+
+        self._values.release()
+        self._values = memoryview(array("d"))
+        if self._buffer is not None:
+            self._buffer.release()
+            self._buffer = None
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # A slice is still in use, the map is closed when it is released.
+                pass
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.start = None
+        self.resolution = None
+
+    def write(self, prices: Iterable[Tuple[float, float]], resolution: int) -> int:
+        """Merge (start epoch, price) pairs into the file, returning how many were new.
+
+        Prices at another resolution than the stored one replace the series.
+        """
+
+        prices = [(int(start), total) for start, total in prices]
+        if not prices:
+            return 0
+
+        if self.resolution not in (None, resolution):
+            self.close()
+            os.remove(self.path)
+
+        starts = [start for start, _ in prices]
+        start = min(starts) if self.start is None else min(self.start, *starts)
+        start -= start % resolution
+        end = max(starts) + resolution
+        if self.end is not None:
+            end = max(end, self.end)
+
+        values = array("d", [math.nan]) * ((end - start) // resolution)
+        if self.start is not None:
+            offset = (self.start - start) // resolution
+            stored = array("d")
+            stored.frombytes(self._values.tobytes())
+            values[offset : offset + len(stored)] = stored
+
+        added = 0
+        for period_start, total in prices:
+            index = (period_start - start) // resolution
+            if math.isnan(values[index]):
+                added += 1
+            values[index] = total
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(_HEADER.pack(_MAGIC, _VERSION, start, resolution))
+            values.tofile(file)
+        self.close()
+        os.replace(temp_path, self.path)
+        self.open()
+        return added
+
+    def remove(self) -> None:
+        """Remove the file."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def count(self) -> int:
+        """Return the number of periods with a price."""
+        return sum(1 for value in self._values if value == value)
+
+    def slice(self, start: float, end: float) -> Tuple[Optional[int], memoryview]:
+        """Return the first start epoch and the prices of the periods in [start, end).
+
+        The prices are a view of the mapped buffer, valid until the next write.
+        """
+
+        if self.start is None:
+            return None, memoryview(array("d"))
+
+        first = max(0, math.ceil((start - self.start) / self.resolution))
+        last = min(len(self._values), math.ceil((end - self.start) / self.resolution))
+        first = min(first, last)
+        return self.start + first * self.resolution, self._values[first:last]
+
+    def prices(self, start: float, end: float) -> List[Tuple[int, float]]:
+        """Return (start epoch, price) of the periods in [start, end) with a price."""
+
+        first, values = self.slice(start, end)
+        return [
+            (first + index * self.resolution, value)
+            for index, value in enumerate(values)
+            if value == value
+        ]
+
+    def aggregate(
+        self, start_date: date, end_date: date, period: str = PERIOD_DAY
+    ) -> Dict[str, List[Any]]:
+        """Return count, mean, min, max and sum of prices per local day or month.
+
+        Covers start_date to end_date, both included, in columnar form.
+        """
+
+        columns: Dict[str, List[Any]] = {
+            "start": [],
+            "count": [],
+            "mean": [],
+            "min": [],
+            "max": [],
+            "sum": [],
+        }
+
+        period_start = (
+            start_date if period == PERIOD_DAY else start_date.replace(day=1)
+        )
+        while period_start <= end_date:
+            if period == PERIOD_DAY:
+                period_end = period_start + timedelta(days=1)
+            else:
+                period_end = (period_start + timedelta(days=32)).replace(day=1)
+
+            _, values = self.slice(
+                dt_util.start_of_local_day(period_start).timestamp(),
+                dt_util.start_of_local_day(period_end).timestamp(),
+            )
+            count, total, low, high = _aggregate(values)
+
+            columns["start"].append(period_start.isoformat())
+            columns["count"].append(count)
+            columns["mean"].append(total / count if count else None)
+            columns["min"].append(low)
+            columns["max"].append(high)
+            columns["sum"].append(total if count else None)
+            period_start = period_end
+
+        return columns
+
+
+def _aggregate(
+    values: memoryview,
+) -> Tuple[int, float, Optional[float], Optional[float]]:
+    """Return count, sum, min and max of the prices in values, skipping NaN."""
+
+    count = 0
+    total = 0.0
+    low = math.inf
+    high = -math.inf
+    for value in values:
+        if value != value:
+            continue
+        count += 1
+        total += value
+        if value < low:
+            low = value
+        if value > high:
+            high = value
+
+    if not count:
+        return 0, 0.0, None, None
+    return count, total, low, high
@@ -0,0 +1,144 @@
+"""Import of Elvia tariffs into Home Assistant long-term statistics."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+import asyncio
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import DOMAIN, LOGGER
+from .coordinator import ElviaDataUpdateCoordinator
+from .store import ElviaTariffHistory
+
+HOUR = 3600
+
+
+class ElviaStatisticsImporter:
+    """Write hourly energy prices as external statistics, from the last imported hour.
+
+    Prices come from the backfilled history and the current payload, and
+    periods shorter than an hour are combined into the hourly mean, min and max.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        coordinator: ElviaDataUpdateCoordinator,
+        history: ElviaTariffHistory,
+        metering_point_id: str,
+    ) -> None:
+        """Initialize."""
+
+        self.hass = hass
+        self.entry = entry
+        self.coordinator = coordinator
+        self.history = history
+        self.statistic_id = f"{DOMAIN}:energy_price_{slugify(str(metering_point_id))}"
+        self.metadata = StatisticMetaData(
+            has_mean=True,
+            has_sum=False,
+            name=f"Elvia energy price {metering_point_id}",
+            source=DOMAIN,
+            statistic_id=self.statistic_id,
+            unit_of_measurement="NOK/kWh",
+        )
+        self.last_imported: Optional[float] = None
+        self.imported = 0
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @callback
+    def async_schedule(self) -> None:
+        """Import new hours in the background, once a refresh has mapped them."""
+
+        if "recorder" not in self.hass.config.components:
+            return
+        if self._task is not None and not self._task.done():
+            return
+        self._task = self.entry.async_create_background_task(
+            self.hass, self.async_import(), f"{DOMAIN} statistics import"
+        )
+
+    async def async_import(self, since: Optional[float] = None) -> int:
+        """Import the hours from since, or after the last imported hour.
+
+        Returns the number of hours written.
+        """
+
+        if "recorder" not in self.hass.config.components:
+            return 0
+
+        async with self._lock:
+            if self.last_imported is None:
+                self.last_imported = await self._async_last_imported()
+
+            if since is not None:
+                start = since - since % HOUR
+            elif self.last_imported is not None:
+                start = self.last_imported + HOUR
+            else:
+                start = 0
+
+            # Prices are known ahead, but only hours that have begun are imported.
+            now = dt_util.utcnow().timestamp()
+            end = now - now % HOUR + HOUR
+
+            statistics = await self._async_hourly_statistics(start, end)
+            if not statistics:
+                return 0
+
+            async_add_external_statistics(self.hass, self.metadata, statistics)
+
+            last = statistics[-1]["start"].timestamp()
+            if self.last_imported is None or last > self.last_imported:
+                self.last_imported = last
+            self.imported += len(statistics)
+            LOGGER.debug(
+                "Imported %s hours of energy prices to %s",
+                len(statistics),
+                self.statistic_id,
+            )
+            return len(statistics)
+
+    async def _async_last_imported(self) -> Optional[float]:
+        """Return the start epoch of the last imported hour."""
+
+        last = await get_instance(self.hass).async_add_executor_job(
+            get_last_statistics, self.hass, 1, self.statistic_id, True, {"mean"}
+        )
+        if not last:
+            return None
+        return last[self.statistic_id][0]["start"]
+
+    async def _async_hourly_statistics(
+        self, start: float, end: float
+    ) -> List[StatisticData]:
+        """Return the statistics of the hours in [start, end) with a known price."""
+
+        prices: Dict[float, float] = dict(await self.history.async_prices(start, end))
+        prices.update(self.coordinator.period_prices(start, end))
+
+        hours: Dict[float, List[Any]] = {}
+        for period_start, price in prices.items():
+            hours.setdefault(period_start - period_start % HOUR, []).append(price)
+
+        return [
+            StatisticData(
+                start=dt_util.utc_from_timestamp(hour),
+                mean=sum(values) / len(values),
+                min=min(values),
+                max=max(values),
+            )
+            for hour, values in sorted(hours.items())
+        ]
@@ -0,0 +1,176 @@
+"""Persistent cache of Elvia API responses."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import asyncio
+from datetime import date, datetime
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import STORAGE_DIR, Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, STORAGE_SAVE_DELAY, STORAGE_VERSION
+from .series import ElviaTariffSeries
+
+
+class ElviaCache:
+    """Keep the last good payloads on disk, each with a validity window."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize."""
+
+        self._store: Store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}")
+        self._data: Dict[str, Any] = {}
+
+    async def async_load(self) -> None:
+        """Load cached payloads from disk."""
+        self._data = await self._store.async_load() or {}
+
+    def get(self, key: str) -> Optional[Tuple[Any, bool]]:
+        """Return the cached payload for key and whether it is still valid."""
+
+        cached = self._data.get(key)
+        if cached is None:
+            return None
+
+        valid_until = dt_util.parse_datetime(cached["valid_until"])
+        fresh = valid_until is not None and dt_util.utcnow() < valid_until
+        return cached["data"], fresh
+
+    def fetched(self, key: str) -> Optional[datetime]:
+        """Return when the cached payload for key was fetched."""
+        cached = self._data.get(key)
+        return None if cached is None else dt_util.parse_datetime(cached["fetched"])
+
+    def state(self) -> Dict[str, Dict[str, str]]:
+        """Return when each payload was fetched and until when it is valid."""
+        return {
+            key: {"fetched": cached["fetched"], "valid_until": cached["valid_until"]}
+            for key, cached in self._data.items()
+        }
+
+    def set(self, key: str, data: Any, valid_until: datetime) -> None:
+        """Cache a payload and schedule a save."""
+
+        self._data[key] = {
+            "fetched": dt_util.utcnow().isoformat(),
+            "valid_until": valid_until.isoformat(),
+            "data": data,
+        }
+        self._store.async_delay_save(lambda: self._data, STORAGE_SAVE_DELAY)
+
+    async def async_flush(self) -> None:
+        """Write pending changes to disk now."""
+        await self._store.async_save(self._data)
+
+    async def async_remove(self) -> None:
+        """Remove the cache from disk."""
+        self._data = {}
+        await self._store.async_remove()
+
+
+class ElviaTariffHistory:
+    """Energy prices of past tariff periods, filled by backfills.
+
+    Prices are kept in a memory-mapped ElviaTariffSeries, and the days already
+    stored in a Store, so an interrupted backfill resumes where it stopped.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize."""
+
+        self.hass = hass
+        self._store: Store = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.history"
+        )
+        self.series = ElviaTariffSeries(
+            hass.config.path(STORAGE_DIR, f"{DOMAIN}.{entry_id}.history.bin")
+        )
+        self._lock = asyncio.Lock()
+        self.loaded = False
+        self.tariff_key: Optional[str] = None
+        self.completed: Set[str] = set()
+        self.count = 0
+
+    async def async_load(self) -> None:
+        """Load the stored days and map the prices."""
+
+        data = await self._store.async_load() or {}
+        self.tariff_key = data.get("tariff_key")
+        self.completed = set(data.get("completed", []))
+        self.count = await self.hass.async_add_executor_job(self._open)
+        self.loaded = True
+
+    def _open(self) -> int:
+        self.series.open()
+        return self.series.count()
+
+    async def async_reset(self, tariff_key: str) -> None:
+        """Forget the history of another tariff."""
+
+        if tariff_key == self.tariff_key:
+            return
+        async with self._lock:
+            await self.hass.async_add_executor_job(self.series.remove)
+            self.tariff_key = tariff_key
+            self.completed = set()
+            self.count = 0
+            self._store.async_delay_save(self._data, STORAGE_SAVE_DELAY)
+
+    async def async_add(
+        self,
+        days: Iterable[str],
+        prices: Iterable[Tuple[float, float]],
+        resolution: int,
+    ) -> None:
+        """Store the prices of a backfill chunk and the days they complete."""
+
+        async with self._lock:
+            self.count += await self.hass.async_add_executor_job(
+                self.series.write, prices, resolution
+            )
+            self.completed.update(days)
+            self._store.async_delay_save(self._data, STORAGE_SAVE_DELAY)
+
+    async def async_aggregate(
+        self, start_date: date, end_date: date, period: str
+    ) -> Dict[str, Any]:
+        """Return prices per day or month, see ElviaTariffSeries.aggregate."""
+
+        if not self.loaded:
+            await self.async_load()
+        async with self._lock:
+            return await self.hass.async_add_executor_job(
+                self.series.aggregate, start_date, end_date, period
+            )
+
+    async def async_prices(self, start: float, end: float) -> List[Tuple[int, float]]:
+        """Return (start epoch, price) of the stored periods in [start, end)."""
+
+        if not self.loaded:
+            await self.async_load()
+        async with self._lock:
+            return await self.hass.async_add_executor_job(
+                self.series.prices, start, end
+            )
+
+    def _data(self) -> Dict[str, Any]:
+        return {
+            "tariff_key": self.tariff_key,
+            "completed": sorted(self.completed),
+        }
+
+    async def async_flush(self) -> None:
+        """Write pending changes to disk now and unmap the prices."""
+        if self.loaded:
+            await self._store.async_save(self._data())
+            await self.hass.async_add_executor_job(self.series.close)
+
+    async def async_remove(self) -> None:
+        """Remove the history from disk."""
+        self.completed = set()
+        self.count = 0
+        await self._store.async_remove()
+        await self.hass.async_add_executor_job(self.series.remove)
@@ -0,0 +1,237 @@
+"""Local tariff engine for Elvia, pricing tariff periods from priceInfo."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+from homeassistant.util import dt as dt_util
+
+from .const import LOGGER
+from .models import EnergyPrice, Hour, PriceInfo, TariffType
+
+DAY_WEEKDAY = "weekday"
+DAY_WEEKEND = "weekend"
+DAY_HOLIDAY = "holiday"
+
+# Day kinds to try, in order, when the profile has not seen a day kind yet
+_FALLBACK_DAY_KINDS = {
+    DAY_WEEKDAY: (DAY_WEEKDAY,),
+    DAY_WEEKEND: (DAY_WEEKEND,),
+    DAY_HOLIDAY: (DAY_HOLIDAY, DAY_WEEKEND),
+}
+
+# Largest difference in NOK between a computed price and the price from Elvia
+PRICE_TOLERANCE = 1e-6
+
+
+def easter_sunday(year: int) -> date:
+    """Return Easter Sunday, by the anonymous Gregorian algorithm."""
+
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+@lru_cache(maxsize=8)
+def norwegian_public_holidays(year: int) -> frozenset[date]:
+    """Return the Norwegian public holidays of a year."""
+
+    easter = easter_sunday(year)
+    return frozenset(
+        {
+            date(year, 1, 1),
+            date(year, 5, 1),
+            date(year, 5, 17),
+            date(year, 12, 25),
+            date(year, 12, 26),
+        }
+        # Maundy Thursday, Good Friday, Easter, Ascension and Whitsun
+        | {easter + timedelta(days=days) for days in (-3, -2, 0, 1, 39, 49, 50)}
+    )
+
+
+def day_kind(tariff_type: TariffType, day: date) -> str:
+    """Return which prices a day uses under a tariff type."""
+
+    if tariff_type.usePublicHolidayPrices and day in norwegian_public_holidays(day.year):
+        return DAY_HOLIDAY
+    if tariff_type.useWeekendPrices and day.weekday() >= 5:
+        return DAY_WEEKEND
+    return DAY_WEEKDAY
+
+
+def _profile_key(kind: str, local: datetime) -> str:
+    """Return the profile key of a day kind and a local time of day."""
+    return f"{kind} {local.hour * 60 + local.minute}"
+
+
+def _parse_time(value: str, end: bool = False) -> Optional[datetime]:
+    """Parse a date or datetime from priceInfo, a date only end is inclusive."""
+
+    if len(value) == 10:
+        day = dt_util.parse_date(value)
+        if day is None:
+            return None
+        return dt_util.start_of_local_day(day + timedelta(days=1) if end else day)
+
+    parsed = dt_util.parse_datetime(value)
+    if parsed is not None and parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+    return parsed
+
+
+def _date_ranges(
+    prices: Iterable[Any],
+) -> List[Tuple[datetime, datetime, Any]]:
+    """Return the prices with a parsed startDate and endDate."""
+
+    ranges = []
+    for price in prices:
+        start = _parse_time(price.startDate)
+        end = _parse_time(price.endDate, end=True)
+        if start is None or end is None:
+            LOGGER.debug("Ignoring price %s without a valid date range", price.id)
+            continue
+        ranges.append((start, end, price))
+    return ranges
+
+
+class TariffEngine:
+    """Price any tariff period from priceInfo and a learned level profile.
+
+    priceInfo has the prices of every season and level with their date ranges,
+    but not which level applies at which time of day. That profile is learned
+    from the hours Elvia returns, by day kind and local time of day, and every
+    batch of hours is checked against the prices computed before learning it.
+    The engine is verified once a profile learned from earlier hours priced a
+    new batch correctly, and stays verified while batches bring no new hours.
+    """
+
+    def __init__(
+        self,
+        tariff_type: TariffType,
+        price_info: PriceInfo,
+        profile: Optional[Dict[str, str]] = None,
+        verified: bool = False,
+    ) -> None:
+        """Initialize."""
+
+        self.tariff_type = tariff_type
+        self.profile: Dict[str, str] = dict(profile or {})
+        self._was_verified = verified
+        self._levels = {price.id: price.level for price in price_info.energyPrices}
+        self._energy_prices = _date_ranges(price_info.energyPrices)
+        self._fixed_prices = _date_ranges(price_info.fixedPrices)
+        self.checked = 0
+        self.mismatches = 0
+
+    @property
+    def verified(self) -> bool:
+        """Return True if the earlier profile priced every hour it knew correctly."""
+        if self.mismatches:
+            return False
+        return self.checked > 0 or self._was_verified
+
+    def level_at(self, when: datetime) -> Optional[str]:
+        """Return the energy price level in effect at when."""
+
+        local = dt_util.as_local(when)
+        for kind in _FALLBACK_DAY_KINDS[day_kind(self.tariff_type, local.date())]:
+            level = self.profile.get(_profile_key(kind, local))
+            if level is not None:
+                return level
+        return None
+
+    def energy_price_at(self, when: datetime) -> Optional[EnergyPrice]:
+        """Return the energy price in effect at when, or None if unknown."""
+
+        level = self.level_at(when)
+        if level is None:
+            return None
+        for start, end, price in self._energy_prices:
+            if price.level == level and start <= when < end:
+                return price
+        return None
+
+    def fixed_price_id_at(self, when: datetime) -> Optional[str]:
+        """Return the id of the fixed price in effect at when."""
+
+        for start, end, price in self._fixed_prices:
+            if start <= when < end:
+                return price.id
+        return None
+
+    def _check(
+        self, hours: Iterable[Tuple[datetime, Hour]], known: bool
+    ) -> Tuple[int, int]:
+        """Return how many hours were checked and how many Elvia prices differently.
+
+        With known set, hours the engine cannot price are not checked.
+        """
+
+        checked = 0
+        mismatches = 0
+        for start, hour in hours:
+            price = self.energy_price_at(start)
+            if price is None and known:
+                continue
+            checked += 1
+            if (
+                price is None
+                or abs(price.total - hour.energyPrice.total) > PRICE_TOLERANCE
+            ):
+                LOGGER.debug(
+                    "Computed %s for %s, Elvia says %s",
+                    None if price is None else price.total,
+                    hour.startTime,
+                    hour.energyPrice.total,
+                )
+                mismatches += 1
+        return checked, mismatches
+
+    def learn(self, hours: Iterable[Hour], since: Optional[float] = None) -> None:
+        """Check the profile against hours from Elvia, then learn from them.
+
+        checked is the number of hours the profile could price before learning.
+        Hours starting before the epoch since were learned from before, so they
+        are not checked.
+        """
+
+        hours = [(dt_util.parse_datetime(hour.startTime), hour) for hour in hours]
+        unseen = [
+            (start, hour)
+            for start, hour in hours
+            if since is None or start.timestamp() >= since
+        ]
+
+        # Hours the profile already covers must match what Elvia says.
+        checked, mismatches = self._check(unseen, known=True)
+
+        for start, hour in hours:
+            level = self._levels.get(hour.energyPrice.id)
+            if level is not None:
+                local = dt_util.as_local(start)
+                self.profile[
+                    _profile_key(day_kind(self.tariff_type, local.date()), local)
+                ] = level
+
+        # After learning, every hour must be priced from priceInfo alone.
+        mismatches += self._check(hours, known=False)[1]
+
+        self.checked = checked
+        self.mismatches = mismatches
+        if mismatches:
+            LOGGER.debug(
+                "Tariff engine mispriced %s of %s hours", mismatches, len(hours)
+            )
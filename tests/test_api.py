@@ -0,0 +1,301 @@
+"""Tests for the Elvia api client."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.elvia import api
+from custom_components.elvia.api import (
+    ApiClientCircuitOpenException,
+    ApiClientRateLimitException,
+    ApiClientResponseException,
+    ApiClientServerException,
+    CircuitBreaker,
+    ElviaApiClient,
+    parse_retry_after,
+)
+from custom_components.elvia.const import (
+    CIRCUIT_BREAKER_RESET,
+    CIRCUIT_BREAKER_THRESHOLD,
+    REQUEST_RETRIES,
+)
+
+URL = "https://elvia.test/endpoint"
+
+
+@pytest.fixture(autouse=True)
+def circuit_breakers():
+    """Give every test its own circuit breakers and no retry delays."""
+    with patch.dict(api._CIRCUIT_BREAKERS, clear=True), patch.object(
+        api, "REQUEST_BACKOFF", 0
+    ):
+        yield api._CIRCUIT_BREAKERS
+
+
+def response(status: int, body: bytes = b"{}", headers=None) -> MagicMock:
+    """Return a response with a status, body and headers."""
+    mock = MagicMock(status=status, headers=headers or {})
+    mock.read = AsyncMock(return_value=body)
+    return mock
+
+
+def client(*statuses: int, api_key: str = "key") -> ElviaApiClient:
+    """Return a client getting the statuses in turn."""
+    session = MagicMock()
+    session.request = AsyncMock(side_effect=[response(status) for status in statuses])
+    return ElviaApiClient(api_key, "1", "token", session=session)
+
+
+def test_parse_retry_after():
+    """Test seconds and HTTP dates."""
+
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after(" 5 ") == 5
+    assert parse_retry_after("soon") is None
+
+    later = datetime.now(timezone.utc) + timedelta(minutes=2)
+    assert 100 < parse_retry_after(format_datetime(later, usegmt=True)) <= 120
+
+    earlier = datetime.now(timezone.utc) - timedelta(minutes=2)
+    assert parse_retry_after(format_datetime(earlier, usegmt=True)) == 0
+
+
+def test_circuit_opens_at_threshold():
+    """Test consecutive failures open the circuit, a success resets them."""
+
+    breaker = CircuitBreaker()
+    for _ in range(CIRCUIT_BREAKER_THRESHOLD - 1):
+        breaker.record_failure()
+    breaker.record_success()
+    assert breaker.failures == 0
+
+    for _ in range(CIRCUIT_BREAKER_THRESHOLD):
+        assert breaker.allow_request()
+        breaker.record_failure()
+    assert not breaker.allow_request()
+
+
+def test_half_open_circuit_lets_one_probe_through():
+    """Test only one request is let through after the reset time."""
+
+    breaker = CircuitBreaker()
+    with patch.object(api, "monotonic", return_value=1000):
+        for _ in range(CIRCUIT_BREAKER_THRESHOLD):
+            breaker.record_failure()
+
+    after_reset = 1000 + CIRCUIT_BREAKER_RESET.total_seconds()
+    with patch.object(api, "monotonic", return_value=after_reset):
+        assert breaker.allow_request()
+        assert not breaker.allow_request()
+
+        # A failed probe opens the circuit again.
+        breaker.record_failure(probe=True)
+        assert not breaker.allow_request()
+
+    later = after_reset + CIRCUIT_BREAKER_RESET.total_seconds()
+    with patch.object(api, "monotonic", return_value=later):
+        assert breaker.allow_request()
+        breaker.record_success()
+        assert breaker.allow_request()
+        assert breaker.allow_request()
+
+
+def test_released_probe_lets_another_through():
+    """Test a probe ending without an outcome does not block the circuit."""
+
+    breaker = CircuitBreaker(
+        failures=CIRCUIT_BREAKER_THRESHOLD,
+        opened_at=api.monotonic() - CIRCUIT_BREAKER_RESET.total_seconds(),
+    )
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.release()
+    assert breaker.allow_request()
+
+
+@pytest.mark.asyncio
+async def test_retries_count_as_one_failure(circuit_breakers):
+    """Test a request failing after its retries counts once."""
+
+    elvia = client(*[503] * (REQUEST_RETRIES + 1))
+    with pytest.raises(ApiClientServerException):
+        await elvia.get(URL)
+
+    assert elvia._session.request.await_count == REQUEST_RETRIES + 1
+    assert circuit_breakers[URL].failures == 1
+    assert circuit_breakers[URL].opened_at is None
+
+
+@pytest.mark.asyncio
+async def test_retry_then_success_closes_circuit(circuit_breakers):
+    """Test a request succeeding on a retry counts no failure."""
+
+    elvia = client(503, 200)
+    assert await elvia.get(URL) == {}
+    assert circuit_breakers[URL].failures == 0
+
+
+@pytest.mark.asyncio
+async def test_refused_request_is_not_a_failure(circuit_breakers):
+    """Test an error status that is not retried shows the endpoint is up."""
+
+    circuit_breakers[URL] = CircuitBreaker(failures=CIRCUIT_BREAKER_THRESHOLD - 1)
+    elvia = client(400)
+    with pytest.raises(ApiClientResponseException):
+        await elvia.get(URL)
+    assert circuit_breakers[URL].failures == 0
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_sends_one_probe(circuit_breakers):
+    """Test concurrent requests to a half open endpoint send one request."""
+
+    circuit_breakers[URL] = CircuitBreaker(
+        failures=CIRCUIT_BREAKER_THRESHOLD,
+        opened_at=api.monotonic() - CIRCUIT_BREAKER_RESET.total_seconds(),
+    )
+
+    async def slow_response(**kwargs):
+        await asyncio.sleep(0.01)
+        return response(200)
+
+    elvia = client()
+    elvia._session.request = AsyncMock(side_effect=slow_response)
+    results = await asyncio.gather(
+        *(elvia.get(f"{URL}?page={page}") for page in range(3)),
+        return_exceptions=True,
+    )
+
+    assert results[0] == {}
+    assert all(
+        isinstance(result, ApiClientCircuitOpenException) for result in results[1:]
+    )
+    assert elvia._session.request.await_count == 1
+    assert circuit_breakers[URL].opened_at is None
+
+
+@pytest.mark.asyncio
+async def test_rate_limits_do_not_open_the_circuit(circuit_breakers):
+    """Test one api key out of quota does not block another."""
+
+    attempts = REQUEST_RETRIES + 1
+    limited = client(*[429] * attempts * CIRCUIT_BREAKER_THRESHOLD, api_key="one")
+    for _ in range(CIRCUIT_BREAKER_THRESHOLD):
+        with pytest.raises(ApiClientRateLimitException):
+            await limited.get(URL)
+    assert circuit_breakers[URL].failures == 0
+
+    assert await client(200, api_key="two").get(URL) == {}
+
+
+def caching_client(*responses: MagicMock, **kwargs) -> ElviaApiClient:
+    """Return a client getting the responses in turn."""
+    session = MagicMock()
+    session.request = AsyncMock(side_effect=responses)
+    return ElviaApiClient("key", "1", "token", session=session, **kwargs)
+
+
+def decode_keys(data: dict) -> tuple:
+    """Decode a body to its keys."""
+    return tuple(data)
+
+
+def decode_values(data: dict) -> tuple:
+    """Decode a body to its values."""
+    return tuple(data.values())
+
+
+@pytest.mark.asyncio
+async def test_not_modified_reuses_the_decoded_object():
+    """Test a revalidated response returns the cached decoded object."""
+
+    elvia = caching_client(
+        response(200, b'{"a": 1}', {"ETag": '"v1"'}),
+        response(304, b"", {"Cache-Control": "max-age=60"}),
+    )
+    first = await elvia.get(URL, decode=decode_keys)
+    second = await elvia.get(URL, decode=decode_keys)
+
+    assert second is first
+    headers = elvia._session.request.await_args.kwargs["headers"]
+    assert headers["If-None-Match"] == '"v1"'
+    assert elvia.cache_stats["revalidations"] == 1
+
+    # The 304 refreshed the max-age, so the next get is a hit.
+    assert await elvia.get(URL, decode=decode_keys) is first
+    assert elvia._session.request.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_max_age_hit():
+    """Test a response within its max-age is not requested again."""
+
+    elvia = caching_client(response(200, b"{}", {"Cache-Control": "max-age=60"}))
+    assert await elvia.get(URL) == await elvia.get(URL)
+    assert elvia._session.request.await_count == 1
+    assert elvia.cache_stats["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_no_store_is_not_cached():
+    """Test a no-store response is requested again."""
+
+    headers = {"Cache-Control": "no-store, max-age=60", "ETag": '"v1"'}
+    elvia = caching_client(response(200, b"{}", headers), response(200))
+    await elvia.get(URL)
+    await elvia.get(URL)
+
+    assert elvia._session.request.await_count == 2
+    assert "If-None-Match" not in elvia._session.request.await_args.kwargs["headers"]
+
+
+@pytest.mark.asyncio
+async def test_cache_ttls_override_headers():
+    """Test the TTL configured for an endpoint is used instead of max-age."""
+
+    elvia = caching_client(
+        response(200, b"{}", {"Cache-Control": "max-age=0"}),
+        cache_ttls={URL: timedelta(minutes=1)},
+    )
+    await elvia.get(f"{URL}?page=1")
+    await elvia.get(f"{URL}?page=1")
+    assert elvia._session.request.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_response_is_evicted():
+    """Test the cache keeps HTTP_CACHE_SIZE responses, dropping the oldest used."""
+
+    elvia = caching_client(
+        *[response(200, b"{}", {"Cache-Control": "max-age=60"}) for _ in range(4)]
+    )
+    with patch.object(api, "HTTP_CACHE_SIZE", 2):
+        await elvia.get(f"{URL}?page=1")
+        await elvia.get(f"{URL}?page=2")
+        await elvia.get(f"{URL}?page=1")
+        await elvia.get(f"{URL}?page=3")
+        assert elvia._session.request.await_count == 3
+
+        await elvia.get(f"{URL}?page=1")
+        assert elvia._session.request.await_count == 3
+        await elvia.get(f"{URL}?page=2")
+        assert elvia._session.request.await_count == 4
+
+
+@pytest.mark.asyncio
+async def test_cache_is_kept_per_decoder():
+    """Test two decoders of the same url do not get each other's results."""
+
+    elvia = caching_client(
+        *[response(200, b'{"a": 1}', {"Cache-Control": "max-age=60"}) for _ in range(3)]
+    )
+    assert await elvia.get(URL, decode=decode_keys) == ("a",)
+    assert await elvia.get(URL, decode=decode_values) == (1,)
+    assert await elvia.get(URL, decode=decode_keys) == ("a",)
+    assert await elvia.get(URL, decode=decode_values) == (1,)
+    assert await elvia.get(URL) == {"a": 1}
+    assert elvia._session.request.await_count == 3
@@ -0,0 +1,111 @@
+"""Tests for the Elvia tariff backfill."""
+
+from datetime import date, timedelta
+
+import pytest
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.elvia.backfill import backfill_chunks, complete_days
+
+HOUR = 3600
+
+
+@pytest.fixture(autouse=True)
+def oslo_time_zone():
+    """Run the tests in the time zone of Elvia."""
+    previous = dt_util.DEFAULT_TIME_ZONE
+    dt_util.set_default_time_zone(dt_util.get_time_zone("Europe/Oslo"))
+    yield
+    dt_util.set_default_time_zone(previous)
+
+
+def days(start: date, end: date):
+    """Return the ISO dates from start to end, both included."""
+    return {
+        (start + timedelta(days=offset)).isoformat()
+        for offset in range((end - start).days + 1)
+    }
+
+
+def test_chunks_of_chunk_days():
+    """Test a range is split into runs of at most chunk_days."""
+
+    assert backfill_chunks(date(2026, 1, 1), date(2026, 1, 16), chunk_days=7) == [
+        (date(2026, 1, 1), date(2026, 1, 7)),
+        (date(2026, 1, 8), date(2026, 1, 14)),
+        (date(2026, 1, 15), date(2026, 1, 16)),
+    ]
+
+
+def test_single_day():
+    """Test a range of one day."""
+
+    assert backfill_chunks(date(2026, 1, 1), date(2026, 1, 1)) == [
+        (date(2026, 1, 1), date(2026, 1, 1))
+    ]
+
+
+def test_resume_skips_completed_days():
+    """Test completed days split the range, and chunks restart after them."""
+
+    completed = days(date(2026, 1, 3), date(2026, 1, 4)) | {"2026-01-12"}
+
+    assert backfill_chunks(
+        date(2026, 1, 1), date(2026, 1, 20), completed, chunk_days=7
+    ) == [
+        (date(2026, 1, 1), date(2026, 1, 2)),
+        (date(2026, 1, 5), date(2026, 1, 11)),
+        (date(2026, 1, 13), date(2026, 1, 19)),
+        (date(2026, 1, 20), date(2026, 1, 20)),
+    ]
+
+
+def test_completed_range():
+    """Test nothing is left when every day is completed."""
+
+    completed = days(date(2026, 1, 1), date(2026, 1, 31))
+    assert backfill_chunks(date(2026, 1, 5), date(2026, 1, 25), completed) == []
+
+
+def test_chunks_cover_missing_days_once():
+    """Test every missing day is in exactly one chunk."""
+
+    start = date(2025, 12, 20)
+    end = date(2026, 3, 10)
+    completed = {day for day in days(start, end) if int(day[-2:]) % 5 == 0}
+
+    chunks = backfill_chunks(start, end, completed, chunk_days=4)
+    covered = [day for first, last in chunks for day in sorted(days(first, last))]
+
+    assert len(covered) == len(set(covered))
+    assert set(covered) == days(start, end) - completed
+    assert all((last - first).days < 4 for first, last in chunks)
+
+
+def prices(day: date):
+    """Return (start epoch, price) for every hour of a local day."""
+    start = int(dt_util.start_of_local_day(day).timestamp())
+    end = int(dt_util.start_of_local_day(day + timedelta(days=1)).timestamp())
+    return [(epoch, 0.5) for epoch in range(start, end, HOUR)]
+
+
+def test_complete_days():
+    """Test only days with a price for every period are complete."""
+
+    partial = prices(date(2026, 3, 3))[:12]
+    assert sorted(
+        complete_days(prices(date(2026, 3, 2)) + partial, HOUR)
+    ) == ["2026-03-02"]
+    assert complete_days([], HOUR) == []
+
+
+def test_complete_days_across_daylight_saving():
+    """Test the 23 and 25 hour days are complete with all their hours."""
+
+    assert len(prices(date(2026, 3, 29))) == 23
+    assert len(prices(date(2026, 10, 25))) == 25
+    assert sorted(
+        complete_days(prices(date(2026, 3, 29)) + prices(date(2026, 10, 25)), HOUR)
+    ) == ["2026-03-29", "2026-10-25"]
+    assert complete_days(prices(date(2026, 10, 25))[:23], HOUR) == []
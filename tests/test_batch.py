@@ -0,0 +1,147 @@
+"""Tests for the Elvia meteringpoint batcher."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from custom_components.elvia.api import ApiClientException, ApiClientServerException
+from custom_components.elvia.batch import ElviaMeteringPointBatcher
+from custom_components.elvia.const import RANGE_TODAY, RANGE_TOMORROW
+
+
+def collections(metering_point_ids, query_range=RANGE_TODAY):
+    """Return a collection per MPID, naming the MPID and range."""
+    return {
+        metering_point_id: {"mpid": metering_point_id, "range": query_range}
+        for metering_point_id in metering_point_ids
+    }
+
+
+def batcher(
+    hass, *metering_point_ids: str, ttl: float = 60
+) -> ElviaMeteringPointBatcher:
+    """Return a batcher with registered MPIDs, answering for every MPID asked."""
+
+    api = MagicMock()
+    api.meteringpoints_data = AsyncMock(side_effect=collections)
+    batcher = ElviaMeteringPointBatcher(hass, api, delay=0, ttl=ttl)
+    for metering_point_id in metering_point_ids:
+        batcher.register(metering_point_id)
+    return batcher
+
+
+@pytest.mark.asyncio
+async def test_mpids_share_one_request(hass):
+    """Test coordinators asking in the same window share one request."""
+
+    elvia = batcher(hass, "1", "2")
+    results = await asyncio.gather(elvia.async_get("1"), elvia.async_get("2"))
+
+    assert [result["mpid"] for result in results] == ["1", "2"]
+    elvia.api.meteringpoints_data.assert_awaited_once_with(["1", "2"], RANGE_TODAY)
+
+
+@pytest.mark.asyncio
+async def test_result_is_kept_for_a_later_coordinator(hass):
+    """Test a registered MPID nobody asked for yet gets the batched result."""
+
+    elvia = batcher(hass, "1", "2")
+    await elvia.async_get("1")
+    assert (await elvia.async_get("2"))["mpid"] == "2"
+    assert elvia.api.meteringpoints_data.await_count == 1
+
+    # A kept result is only used once.
+    await elvia.async_get("2")
+    assert elvia.api.meteringpoints_data.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_kept_result_expires(hass):
+    """Test a result older than the ttl is fetched again."""
+
+    elvia = batcher(hass, "1", "2", ttl=0)
+    await elvia.async_get("1")
+    await elvia.async_get("2")
+    assert elvia.api.meteringpoints_data.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_ranges_are_batched_apart(hass):
+    """Test every range has its own request."""
+
+    elvia = batcher(hass, "1")
+    today, tomorrow = await asyncio.gather(
+        elvia.async_get("1"), elvia.async_get("1", RANGE_TOMORROW)
+    )
+
+    assert today["range"] == RANGE_TODAY
+    assert tomorrow["range"] == RANGE_TOMORROW
+    assert elvia.api.meteringpoints_data.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_missing_mpid_raises(hass):
+    """Test a MPID without a collection in the response fails its waiter only."""
+
+    elvia = batcher(hass, "1", "2")
+    elvia.api.meteringpoints_data.side_effect = (
+        lambda metering_point_ids, query_range: collections(["1"], query_range)
+    )
+    one, two = await asyncio.gather(
+        elvia.async_get("1"), elvia.async_get("2"), return_exceptions=True
+    )
+
+    assert one["mpid"] == "1"
+    assert isinstance(two, ApiClientException)
+
+
+@pytest.mark.asyncio
+async def test_upstream_error_reaches_every_waiter(hass):
+    """Test a failed request fails every coordinator waiting for it."""
+
+    elvia = batcher(hass, "1", "2")
+    error = ApiClientServerException("Bad gateway", 502)
+    elvia.api.meteringpoints_data.side_effect = error
+
+    results = await asyncio.gather(
+        elvia.async_get("1"),
+        elvia.async_get("1"),
+        elvia.async_get("2"),
+        return_exceptions=True,
+    )
+    assert results == [error, error, error]
+
+    # Nothing is kept from a failed request.
+    elvia.api.meteringpoints_data.side_effect = collections
+    assert (await elvia.async_get("2"))["mpid"] == "2"
+    assert elvia.api.meteringpoints_data.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_unregister_drops_kept_results(hass):
+    """Test an unregistered MPID is neither fetched nor kept."""
+
+    elvia = batcher(hass, "1", "2", "3")
+    await elvia.async_get("1")
+    elvia.unregister("2")
+    assert elvia.metering_point_ids == {"1", "3"}
+
+    # Asking again for "2" fetches it, it was not kept.
+    await elvia.async_get("2")
+    assert elvia.api.meteringpoints_data.await_count == 2
+    elvia.api.meteringpoints_data.assert_awaited_with(["1", "2", "3"], RANGE_TODAY)
+
+    await elvia.async_get("3")
+    assert elvia.api.meteringpoints_data.await_count == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("metering_point_id", [1, "1"])
+async def test_mpids_are_strings(hass, metering_point_id):
+    """Test MPIDs given as numbers are registered as strings."""
+
+    elvia = batcher(hass)
+    elvia.register(metering_point_id)
+    assert elvia.metering_point_ids == {"1"}
+    assert (await elvia.async_get(metering_point_id))["mpid"] == "1"
@@ -0,0 +1,244 @@
+"""Tests for the Elvia coordinators."""
+
+import copy
+import json
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.elvia.coordinator import (
+    NO_FIXED_PRICE,
+    ElviaDataUpdateCoordinator,
+    build_fixed_price_index,
+    merge_payloads,
+)
+from custom_components.elvia.models import decode_grid_tariff_collection
+from custom_components.elvia.store import ElviaCache
+
+COLLECTION = json.loads(
+    (Path(__file__).parent / "schemas" / "meteringpointsgridtariffs.json").read_text()
+)["gridTariffCollections"][0]
+
+
+def price_level(level: dict, level_id: str, total: float, hourly) -> dict:
+    """Return a copy of a price level with an id, monthly total and hourly price."""
+    hour_prices = []
+    if hourly is not None:
+        hour_prices.append({**level["hourPrices"][0], "total": hourly})
+    return {
+        **level,
+        "id": level_id,
+        "levelInfo": f"{level_id} kWh",
+        "monthlyTotal": total,
+        "hourPrices": hour_prices,
+    }
+
+
+def test_build_fixed_price_index():
+    """Test every fixed price and level is indexed, without an hourly price too."""
+
+    data = copy.deepcopy(COLLECTION)
+    fixed_prices = data["gridTariff"]["tariffPrice"]["priceInfo"]["fixedPrices"]
+    fixed_price = fixed_prices[0]
+    level = fixed_price["priceLevels"][0]
+    fixed_prices[:] = [
+        {
+            **fixed_price,
+            "id": "winter",
+            "priceLevels": [
+                price_level(level, "0-2", 125.0, 0.17),
+                price_level(level, "2-5", 200.0, 0.27),
+            ],
+        },
+        {
+            **fixed_price,
+            "id": "summer",
+            "priceLevels": [price_level(level, "0-2", 100.0, None)],
+        },
+    ]
+
+    price_info = decode_grid_tariff_collection(data).gridTariff.tariffPrice.priceInfo
+    index = build_fixed_price_index(price_info)
+
+    assert set(index) == {("winter", "0-2"), ("winter", "2-5"), ("summer", "0-2")}
+    assert index[("winter", "2-5")] == {
+        "fixed_price_hourly": 0.27,
+        "fixed_price_level_info": "2-5 kWh",
+        "fixed_price_level": 200.0,
+    }
+    assert index[("summer", "0-2")]["fixed_price_hourly"] is None
+    assert index.get(("summer", "2-5"), NO_FIXED_PRICE) is NO_FIXED_PRICE
+
+
+def day_payload(day: str, energy_price_id: str) -> dict:
+    """Return a collection with two hours of a day and one energy price."""
+
+    data = copy.deepcopy(COLLECTION)
+    tariff_price = data["gridTariff"]["tariffPrice"]
+    hour = tariff_price["hours"][0]
+    tariff_price["hours"] = [
+        {
+            **hour,
+            "startTime": f"{day}T{start:02}:00:00+01:00",
+            "expiredAt": f"{day}T{start + 1:02}:00:00+01:00",
+        }
+        for start in (0, 1)
+    ]
+    energy_price = tariff_price["priceInfo"]["energyPrices"][0]
+    tariff_price["priceInfo"]["energyPrices"] = [
+        {**energy_price, "id": energy_price_id}
+    ]
+    return data
+
+
+def test_merge_payloads():
+    """Test later periods and prices are added and ended periods dropped."""
+
+    today = day_payload("2026-03-02", "winter")
+    tomorrow = day_payload("2026-03-03", "spring")
+    # The first hour of today ends at since, so it is dropped.
+    since = datetime.fromisoformat("2026-03-02T01:00:00+01:00").timestamp()
+
+    merged = merge_payloads(today, tomorrow, since)
+    tariff_price = merged["gridTariff"]["tariffPrice"]
+
+    assert [hour["startTime"] for hour in tariff_price["hours"]] == [
+        "2026-03-02T01:00:00+01:00",
+        "2026-03-03T00:00:00+01:00",
+        "2026-03-03T01:00:00+01:00",
+    ]
+    assert [
+        price["id"] for price in tariff_price["priceInfo"]["energyPrices"]
+    ] == ["winter", "spring"]
+    assert len(tariff_price["priceInfo"]["fixedPrices"]) == 1
+    assert merged["meteringPointsAndPriceLevels"] == tomorrow[
+        "meteringPointsAndPriceLevels"
+    ]
+    assert len(today["gridTariff"]["tariffPrice"]["hours"]) == 2
+
+    decode_grid_tariff_collection(merged)
+
+
+def tariff_payload(day: date) -> dict:
+    """Return a collection with every hour of a weekday, priced day and night."""
+
+    data = copy.deepcopy(COLLECTION)
+    data["gridTariff"]["tariffType"]["resolution"] = 60
+    tariff_price = data["gridTariff"]["tariffPrice"]
+    energy_price = tariff_price["priceInfo"]["energyPrices"][0]
+    tariff_price["priceInfo"]["energyPrices"] = [
+        {
+            **energy_price,
+            "id": name,
+            "level": name,
+            "startDate": "2026-01-01",
+            "endDate": "2026-12-31",
+            "total": total,
+        }
+        for name, total in (("day", 0.4), ("night", 0.3))
+    ]
+
+    template = tariff_price["hours"][0]
+    hours = []
+    start = dt_util.as_utc(dt_util.start_of_local_day(day))
+    while dt_util.as_local(start).date() == day:
+        local = dt_util.as_local(start)
+        end = start + timedelta(hours=1)
+        name = "day" if 6 <= local.hour < 22 else "night"
+        hours.append(
+            {
+                **template,
+                "startTime": local.isoformat(),
+                "expiredAt": dt_util.as_local(end).isoformat(),
+                "energyPrice": {
+                    "id": name,
+                    "total": 0.4 if name == "day" else 0.3,
+                    "totalExVat": 0.0,
+                },
+            }
+        )
+        start = end
+    tariff_price["hours"] = hours
+    return data
+
+
+def tariff_coordinator(hass, cache: ElviaCache) -> ElviaDataUpdateCoordinator:
+    """Return a coordinator of the test tariff, sharing a cache."""
+    tariff_type = decode_grid_tariff_collection(COLLECTION).gridTariff.tariffType
+    return ElviaDataUpdateCoordinator(
+        hass,
+        MagicMock(_metering_point_id="mpid"),
+        MagicMock(),
+        cache,
+        MagicMock(),
+        "entry",
+        tariff_type,
+    )
+
+
+@pytest.mark.asyncio
+async def test_engine_is_not_verified_by_remapped_hours(hass):
+    """Test mapping learned hours again, as on a restart, does not verify."""
+
+    cache = ElviaCache(hass, "entry")
+    today = tariff_payload(date(2026, 3, 2))
+
+    await tariff_coordinator(hass, cache).async_use_payload(today)
+    restarted = tariff_coordinator(hass, cache)
+    await restarted.async_use_payload(today)
+    assert restarted.engine.checked == 0
+    assert not restarted.engine.verified
+
+
+@pytest.mark.asyncio
+async def test_engine_is_verified_by_the_merged_next_day(hass):
+    """Test only the hours of the next day are checked in a merged payload."""
+
+    cache = ElviaCache(hass, "entry")
+    today = tariff_payload(date(2026, 3, 2))
+    coordinator = tariff_coordinator(hass, cache)
+    await coordinator.async_use_payload(today)
+
+    since = dt_util.start_of_local_day(date(2026, 3, 2)).timestamp()
+    merged = merge_payloads(today, tariff_payload(date(2026, 3, 3)), since)
+    await coordinator.async_use_payload(merged)
+    assert coordinator.engine.checked == 24
+    assert coordinator.engine.verified
+
+    # The verification is kept while no new hours are checked.
+    restarted = tariff_coordinator(hass, cache)
+    await restarted.async_use_payload(merged)
+    assert restarted.engine.checked == 0
+    assert restarted.engine.verified
+
+
+@pytest.mark.asyncio
+async def test_periods_are_mapped_to_columns(hass):
+    """Test periods are kept as columns and looked up by epoch."""
+
+    coordinator = tariff_coordinator(hass, ElviaCache(hass, "entry"))
+    await coordinator.async_use_payload(tariff_payload(date(2026, 3, 2)))
+
+    start = dt_util.start_of_local_day(date(2026, 3, 2)).timestamp()
+    assert len(coordinator.hour_starts) == 24
+    assert coordinator.hour_starts[0] == start
+    assert coordinator.energy_prices[6] == 0.4
+    assert coordinator.covered_date == date(2026, 3, 2)
+
+    hour_price = coordinator.hour_price_at(dt_util.utc_from_timestamp(start + 5400))
+    assert hour_price["start"] == start + 3600
+    assert hour_price["end"] == start + 7200
+    assert hour_price["energy_price"] == 0.3
+    assert hour_price["fixed_price_id"] == "string"
+    assert dt_util.parse_datetime(hour_price["startTime"]).timestamp() == start + 3600
+
+    assert coordinator.period_prices(start + 3600, start + 3 * 3600) == [
+        (start + 3600, 0.3),
+        (start + 2 * 3600, 0.3),
+    ]
+    assert coordinator.period_index(start - 1) is None
+    assert coordinator.period_index(start + 24 * 3600) is None
@@ -0,0 +1,158 @@
+"""Tests for the Elvia tariff series."""
+
+import math
+from datetime import date, timedelta
+
+import pytest
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.elvia.series import PERIOD_DAY, PERIOD_MONTH, ElviaTariffSeries
+
+HOUR = 3600
+
+
+@pytest.fixture(autouse=True)
+def oslo_time_zone():
+    """Run the tests in the time zone of Elvia."""
+    previous = dt_util.DEFAULT_TIME_ZONE
+    dt_util.set_default_time_zone(dt_util.get_time_zone("Europe/Oslo"))
+    yield
+    dt_util.set_default_time_zone(previous)
+
+
+@pytest.fixture
+def series(tmp_path):
+    """Return an empty series, closed after the test."""
+    series = ElviaTariffSeries(str(tmp_path / "storage" / "elvia.history.bin"))
+    series.open()
+    yield series
+    series.close()
+
+
+def day_start(day: date) -> int:
+    """Return the epoch of the start of a local day."""
+    return int(dt_util.start_of_local_day(day).timestamp())
+
+
+def hours(day: date, price: float = 0.5):
+    """Return (start epoch, price) for every hour of a local day."""
+    start = day_start(day)
+    end = day_start(day + timedelta(days=1))
+    return [(epoch, price) for epoch in range(start, end, HOUR)]
+
+
+def test_empty(series):
+    """Test a series without a file."""
+
+    assert len(series) == 0
+    assert series.start is None
+    assert series.end is None
+    assert series.count() == 0
+    assert series.prices(0, 2**40) == []
+
+
+def test_write_and_reopen(series):
+    """Test prices survive closing and mapping the file again."""
+
+    assert series.write(hours(date(2026, 3, 2)), HOUR) == 24
+    assert series.count() == 24
+    assert series.start == day_start(date(2026, 3, 2))
+    assert series.resolution == HOUR
+
+    reopened = ElviaTariffSeries(series.path)
+    reopened.open()
+    assert reopened.prices(0, 2**40) == series.prices(0, 2**40)
+    reopened.close()
+
+
+def test_write_merges_around_gaps(series):
+    """Test later and earlier days are merged, with NaN in between."""
+
+    series.write(hours(date(2026, 3, 4), 0.4), HOUR)
+    series.write(hours(date(2026, 3, 2), 0.2), HOUR)
+
+    assert series.start == day_start(date(2026, 3, 2))
+    assert series.end == day_start(date(2026, 3, 5))
+    assert len(series) == 72
+    assert series.count() == 48
+
+    _, values = series.slice(day_start(date(2026, 3, 3)), day_start(date(2026, 3, 4)))
+    assert all(math.isnan(value) for value in values)
+
+
+def test_write_counts_only_new_periods(series):
+    """Test overwritten prices are replaced but not counted as new."""
+
+    series.write(hours(date(2026, 3, 2), 0.2), HOUR)
+    assert series.write(hours(date(2026, 3, 2), 0.3), HOUR) == 0
+    assert {price for _, price in series.prices(0, 2**40)} == {0.3}
+    assert series.write([], HOUR) == 0
+
+
+def test_write_other_resolution_replaces(series):
+    """Test prices at another resolution replace the series."""
+
+    series.write(hours(date(2026, 3, 2)), HOUR)
+    start = day_start(date(2026, 3, 3))
+    quarters = [(start + index * 900, 0.1) for index in range(4)]
+
+    assert series.write(quarters, 900) == 4
+    assert series.resolution == 900
+    assert series.start == start
+    assert series.count() == 4
+
+
+def test_slice_and_prices(series):
+    """Test slices start at the first period at or after start."""
+
+    series.write(hours(date(2026, 3, 2)), HOUR)
+    start = day_start(date(2026, 3, 2))
+
+    first, values = series.slice(start + 1, start + 3 * HOUR)
+    assert first == start + HOUR
+    assert len(values) == 2
+
+    assert series.slice(start - 10 * HOUR, start)[1].tolist() == []
+    assert len(series.slice(start - 10 * HOUR, start + 2**30)[1]) == 24
+    assert series.prices(start, start + 2 * HOUR) == [
+        (start, 0.5),
+        (start + HOUR, 0.5),
+    ]
+
+
+def test_aggregate_days_across_daylight_saving(series):
+    """Test days are local, so the daylight saving day has 23 periods."""
+
+    for day in (date(2026, 3, 28), date(2026, 3, 29)):
+        series.write(hours(day, 0.25), HOUR)
+
+    columns = series.aggregate(date(2026, 3, 28), date(2026, 3, 30), PERIOD_DAY)
+    assert columns["start"] == ["2026-03-28", "2026-03-29", "2026-03-30"]
+    assert columns["count"] == [24, 23, 0]
+    assert columns["mean"] == [0.25, 0.25, None]
+    assert columns["sum"][1] == pytest.approx(23 * 0.25)
+    assert columns["min"][2] is None
+
+
+def test_aggregate_months(series):
+    """Test months start on the first, whatever the start date."""
+
+    series.write(hours(date(2026, 1, 31), 0.1) + hours(date(2026, 2, 1), 0.3), HOUR)
+
+    columns = series.aggregate(date(2026, 1, 15), date(2026, 2, 10), PERIOD_MONTH)
+    assert columns["start"] == ["2026-01-01", "2026-02-01"]
+    assert columns["count"] == [24, 24]
+    assert columns["min"] == [0.1, 0.3]
+    assert columns["max"] == [0.1, 0.3]
+
+
+def test_remove(series):
+    """Test the file is removed and the series emptied."""
+
+    series.write(hours(date(2026, 3, 2)), HOUR)
+    series.remove()
+    assert len(series) == 0
+
+    series.open()
+    assert series.start is None
@@ -0,0 +1,236 @@
+"""Tests for the Elvia tariff engine."""
+
+import copy
+import json
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import attr
+import pytest
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.elvia.models import decode_grid_tariff
+from custom_components.elvia.tariff import (
+    DAY_HOLIDAY,
+    DAY_WEEKDAY,
+    DAY_WEEKEND,
+    TariffEngine,
+    _parse_time,
+    day_kind,
+    easter_sunday,
+    norwegian_public_holidays,
+)
+
+TARIFFQUERY = json.loads(
+    (Path(__file__).parent / "schemas" / "tariffquery.json").read_text()
+)
+
+DAY_PRICE = 0.4
+NIGHT_PRICE = 0.3
+
+
+@pytest.fixture(autouse=True)
+def oslo_time_zone():
+    """Run the tests in the time zone of Elvia."""
+    previous = dt_util.DEFAULT_TIME_ZONE
+    dt_util.set_default_time_zone(dt_util.get_time_zone("Europe/Oslo"))
+    yield
+    dt_util.set_default_time_zone(previous)
+
+
+def level(day: date, hour: int) -> str:
+    """Return the level Elvia uses in an hour of a day."""
+    if day.weekday() >= 5 or day in norwegian_public_holidays(day.year):
+        return "night"
+    return "day" if 6 <= hour < 22 else "night"
+
+
+def grid_tariff(day: date):
+    """Return a decoded tariffquery response for a day, priced by level."""
+
+    data = copy.deepcopy(TARIFFQUERY)
+    tariff_type = data["gridTariff"]["tariffType"]
+    tariff_type.update(
+        resolution=60, usePublicHolidayPrices=True, useWeekendPrices=True
+    )
+
+    tariff_price = data["gridTariff"]["tariffPrice"]
+    energy_price = tariff_price["priceInfo"]["energyPrices"][0]
+    tariff_price["priceInfo"]["energyPrices"] = [
+        {
+            **energy_price,
+            "id": name,
+            "level": name,
+            "startDate": "2026-01-01",
+            "endDate": "2026-12-31",
+            "total": total,
+        }
+        for name, total in (("day", DAY_PRICE), ("night", NIGHT_PRICE))
+    ]
+    tariff_price["priceInfo"]["fixedPrices"][0].update(
+        id="fixed", startDate="2026-01-01", endDate="2026-12-31"
+    )
+
+    template = tariff_price["hours"][0]
+    hours = []
+    start = dt_util.as_utc(dt_util.start_of_local_day(day))
+    while dt_util.as_local(start).date() == day:
+        local = dt_util.as_local(start)
+        end = start + timedelta(hours=1)
+        name = level(day, local.hour)
+        hours.append(
+            {
+                **template,
+                "startTime": local.isoformat(),
+                "expiredAt": dt_util.as_local(end).isoformat(),
+                "energyPrice": {
+                    "id": name,
+                    "total": DAY_PRICE if name == "day" else NIGHT_PRICE,
+                    "totalExVat": 0.0,
+                },
+            }
+        )
+        start = end
+    tariff_price["hours"] = hours
+
+    return decode_grid_tariff(data)
+
+
+def learn(profile, day: date) -> TariffEngine:
+    """Return an engine with a profile, after learning the hours of a day."""
+    tariff = grid_tariff(day)
+    engine = TariffEngine(tariff.tariffType, tariff.tariffPrice.priceInfo, profile)
+    engine.learn(tariff.tariffPrice.hours)
+    return engine
+
+
+@pytest.mark.parametrize(
+    "year,easter",
+    [
+        (2024, date(2024, 3, 31)),
+        (2025, date(2025, 4, 20)),
+        (2026, date(2026, 4, 5)),
+        (2038, date(2038, 4, 25)),
+    ],
+)
+def test_easter_sunday(year, easter):
+    """Test Easter Sunday."""
+    assert easter_sunday(year) == easter
+
+
+def test_norwegian_public_holidays():
+    """Test the holidays of a year."""
+    assert norwegian_public_holidays(2026) == {
+        date(2026, 1, 1),
+        date(2026, 4, 2),
+        date(2026, 4, 3),
+        date(2026, 4, 5),
+        date(2026, 4, 6),
+        date(2026, 5, 1),
+        date(2026, 5, 14),
+        date(2026, 5, 17),
+        date(2026, 5, 24),
+        date(2026, 5, 25),
+        date(2026, 12, 25),
+        date(2026, 12, 26),
+    }
+
+
+def test_day_kind():
+    """Test holidays come before weekends, if the tariff type uses them."""
+
+    tariff_type = grid_tariff(date(2026, 3, 2)).tariffType
+    assert day_kind(tariff_type, date(2026, 3, 2)) == DAY_WEEKDAY
+    assert day_kind(tariff_type, date(2026, 3, 7)) == DAY_WEEKEND
+    assert day_kind(tariff_type, date(2026, 5, 17)) == DAY_HOLIDAY
+
+    weekdays_only = attr.evolve(
+        tariff_type, usePublicHolidayPrices=False, useWeekendPrices=False
+    )
+    assert day_kind(weekdays_only, date(2026, 5, 17)) == DAY_WEEKDAY
+
+
+def test_parse_time_date_only_end_is_inclusive():
+    """Test a date only end covers the whole day."""
+
+    assert _parse_time("2026-03-31") == datetime(
+        2026, 3, 31, tzinfo=dt_util.DEFAULT_TIME_ZONE
+    )
+    assert _parse_time("2026-03-31", end=True) == datetime(
+        2026, 4, 1, tzinfo=dt_util.DEFAULT_TIME_ZONE
+    )
+    assert _parse_time("2026-03-31T12:00:00").tzinfo is not None
+    assert _parse_time("2026-13-01") is None
+
+
+def test_engine_is_not_verified_by_the_hours_it_learned():
+    """Test the first payload only teaches the profile."""
+
+    engine = learn(None, date(2026, 3, 2))
+    assert engine.profile
+    assert engine.checked == 0
+    assert engine.mismatches == 0
+    assert not engine.verified
+
+
+def test_engine_is_verified_by_later_hours():
+    """Test a profile from earlier days is checked against a new day."""
+
+    engine = learn(learn(None, date(2026, 3, 2)).profile, date(2026, 3, 3))
+    assert engine.checked == 24
+    assert engine.mismatches == 0
+    assert engine.verified
+
+
+def test_engine_is_not_verified_by_unknown_day_kinds():
+    """Test a weekday profile does not check a weekend."""
+
+    engine = learn(learn(None, date(2026, 3, 6)).profile, date(2026, 3, 7))
+    assert engine.checked == 0
+    assert not engine.verified
+
+
+def test_engine_counts_mismatches():
+    """Test hours priced differently than by the profile fail verification."""
+
+    profile = learn(None, date(2026, 3, 2)).profile
+    profile = {key: "night" for key in profile}
+
+    engine = learn(profile, date(2026, 3, 3))
+    assert engine.checked == 24
+    assert engine.mismatches == 16
+    assert not engine.verified
+
+
+def test_engine_prices_days_ahead():
+    """Test a verified engine prices weekdays, weekends and holidays ahead."""
+
+    engine = learn(None, date(2026, 3, 6))
+    engine = learn(engine.profile, date(2026, 3, 7))
+    engine = learn(engine.profile, date(2026, 3, 9))
+    assert engine.verified
+
+    for day in (date(2026, 3, 10), date(2026, 3, 14), date(2026, 4, 3)):
+        for hour in grid_tariff(day).tariffPrice.hours:
+            price = engine.energy_price_at(dt_util.parse_datetime(hour.startTime))
+            assert price is not None
+            assert price.total == hour.energyPrice.total
+
+    noon = dt_util.parse_datetime("2026-03-10T12:00:00+01:00")
+    assert engine.fixed_price_id_at(noon) == "fixed"
+    assert engine.energy_price_at(noon + timedelta(days=365)) is None
+
+
+def test_engine_handles_daylight_saving_days():
+    """Test the 23 hour day is priced by local time of day."""
+
+    engine = learn(None, date(2026, 3, 27))
+    engine = learn(engine.profile, date(2026, 3, 28))
+    engine = learn(engine.profile, date(2026, 3, 30))
+
+    hours = grid_tariff(date(2026, 3, 29)).tariffPrice.hours
+    assert len(hours) == 23
+    for hour in hours:
+        price = engine.energy_price_at(dt_util.parse_datetime(hour.startTime))
+        assert price.total == hour.energyPrice.total